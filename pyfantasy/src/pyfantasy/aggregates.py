@@ -0,0 +1,354 @@
+import json
+from pathlib import Path
+
+import path_config
+import validation
+
+import pandas as pd
+
+
+class TournamentAggregates():
+
+    def __init__(self) -> None:
+
+        # tournament_id -> contribution (winner, season, purse, total) applied
+        self.tournaments = {}
+
+        self.winners = {}
+        self.seasons = {}
+
+        # running totals over every tournament with a winner
+        self.total_tournaments = 0
+        self.total_purse = 0
+
+    def new_winner(self):
+        return {
+            "winner_name": None,
+            "wins": 0,
+            "win_total_sum": 0,
+            "win_total_count": 0,
+            "purse_won": 0,
+            "season_wins": {},
+        }
+
+    def new_season(self):
+        return {
+            "tournaments": 0,
+            "purse": 0,
+            "win_total_sum": 0,
+            "win_total_count": 0,
+            "winners": {},
+        }
+
+    def contribution(self, tournament_info):
+        """What a tournament adds to the aggregates, None without a winner."""
+        w_id = tournament_info["winner_id"]
+        if pd.isna(w_id) or w_id == "":
+            return None
+
+        purse = pd.to_numeric(tournament_info["tournament_purse"], errors="coerce")
+        win_total = pd.to_numeric(tournament_info["win_total"], errors="coerce")
+
+        return {
+            "winner_id": str(w_id),
+            "winner_name": str(tournament_info["winner_name"]),
+            "season_id": str(tournament_info["season_id"]),
+            "purse": 0 if pd.isna(purse) else int(purse),
+            "win_total": None if pd.isna(win_total) else int(win_total),
+        }
+
+    def apply(self, contribution, sign):
+        """Add (sign 1) or remove (sign -1) a tournament contribution."""
+        w_id = contribution["winner_id"]
+        s_id = contribution["season_id"]
+        purse = contribution["purse"]
+        win_total = contribution["win_total"]
+
+        winner = self.winners.setdefault(w_id, self.new_winner())
+        if sign > 0:
+            winner["winner_name"] = contribution["winner_name"]
+        winner["wins"] += sign
+        winner["purse_won"] += sign * purse
+        winner["season_wins"][s_id] = winner["season_wins"].get(s_id, 0) + sign
+
+        season = self.seasons.setdefault(s_id, self.new_season())
+        season["tournaments"] += sign
+        season["purse"] += sign * purse
+        season["winners"][w_id] = season["winners"].get(w_id, 0) + sign
+
+        if win_total is not None:
+            winner["win_total_sum"] += sign * win_total
+            winner["win_total_count"] += sign
+            season["win_total_sum"] += sign * win_total
+            season["win_total_count"] += sign
+
+        self.total_tournaments += sign
+        self.total_purse += sign * purse
+
+        # drop entries emptied by a removal
+        if not winner["season_wins"][s_id]:
+            del winner["season_wins"][s_id]
+        if not winner["wins"]:
+            del self.winners[w_id]
+        if not season["winners"][w_id]:
+            del season["winners"][w_id]
+        if not season["tournaments"]:
+            del self.seasons[s_id]
+
+    def add_tournament(self, tournament_info):
+        """Add or update a single tournament in the running aggregates.
+
+        Tournaments without a winner (cancelled or not finished) are not
+        added, so they are picked up once a winner is available. A
+        tournament seen before with different values, e.g. a leader
+        stored mid event or a corrected winner, has its old contribution
+        replaced by the new one.
+
+        Parameters
+        ----------
+        tournament_info : dict
+            Tournament fields as held by EspnTournament.tournament_info.
+
+        Returns
+        -------
+        bool
+            True if the tournament was added or updated.
+
+        Examples
+        --------
+        >>> t_agg = TournamentAggregates()
+        >>> t_agg.add_tournament(espn_t.tournament_info)
+        True
+        """
+        t_id = str(tournament_info["tournament_id"])
+        contribution = self.contribution(tournament_info)
+
+        previous = self.tournaments.get(t_id)
+        if contribution is None or contribution == previous:
+            return False
+
+        if previous is not None:
+            self.apply(previous, -1)
+
+        self.apply(contribution, 1)
+        self.tournaments[t_id] = contribution
+
+        return True
+
+    def update(self, df):
+        """Update aggregates with new tournament rows.
+
+        Only rows that are new or whose values changed are applied, so
+        feeding the full history again costs a comparison per row.
+        Tournament overrides are applied before aggregating.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Tournament data, e.g. EspnSeason.feed_season_data or
+            CleanTournaments.cleaned_df.
+
+        Returns
+        -------
+        int
+            Number of tournaments added or updated.
+
+        Examples
+        --------
+        >>> t_agg = TournamentAggregates()
+        >>> t_agg.update(clean_tourn.cleaned_df)
+        """
+        df = validation.apply_overrides(df, validation.load_overrides())
+
+        added = 0
+        for tournament_info in df.to_dict("records"):
+            if self.add_tournament(tournament_info):
+                added += 1
+
+        return added
+
+    def update_from_season(self, e_season):
+        """Update aggregates from an EspnSeason after retrieval.
+
+        Tournament overrides are applied to season_data before aggregating.
+
+        Parameters
+        ----------
+        e_season : EspnSeason
+            Season holding retrieved tournaments in season_data.
+
+        Returns
+        -------
+        int
+            Number of tournaments added or updated.
+
+        Examples
+        --------
+        >>> e_season = EspnSeason(2018)
+        >>> e_season.retrieve_all_seasons()
+        >>> t_agg.update_from_season(e_season)
+        """
+        tournament_infos = [tournament.tournament_info for tournament in e_season.season_data]
+        validation.override_tournaments(tournament_infos)
+
+        added = 0
+        for tournament_info in tournament_infos:
+            if self.add_tournament(tournament_info):
+                added += 1
+
+        return added
+
+    def winner_frame(self):
+        """Per player aggregates.
+
+        Returns
+        -------
+        pd.DataFrame
+            Wins, average winning total, seasons with a win and purse
+            weighted wins indexed by winner_id. Purse weighted wins count
+            each win by its purse relative to the average purse.
+
+        Examples
+        --------
+        >>> t_agg.winner_frame().sort_values("wins", ascending=False)
+        """
+        avg_purse = self.total_purse / self.total_tournaments if self.total_tournaments else 0
+
+        rows = []
+        for w_id, winner in self.winners.items():
+            rows.append({
+                "winner_id": w_id,
+                "winner_name": winner["winner_name"],
+                "wins": winner["wins"],
+                "avg_win_total": (winner["win_total_sum"] / winner["win_total_count"]
+                                  if winner["win_total_count"] else None),
+                "seasons_with_win": len(winner["season_wins"]),
+                "wins_per_season": winner["wins"] / len(winner["season_wins"]),
+                "purse_won": winner["purse_won"],
+                "purse_weighted_wins": winner["purse_won"] / avg_purse if avg_purse else None,
+            })
+
+        columns = ["winner_id", "winner_name", "wins", "avg_win_total", "seasons_with_win",
+                   "wins_per_season", "purse_won", "purse_weighted_wins"]
+
+        return pd.DataFrame(rows, columns=columns).set_index("winner_id")
+
+    def season_frame(self):
+        """Per season aggregates.
+
+        Returns
+        -------
+        pd.DataFrame
+            Tournaments, total purse, average winning total and distinct
+            winners indexed by season_id.
+
+        Examples
+        --------
+        >>> t_agg.season_frame()
+        """
+        rows = []
+        for s_id, season in self.seasons.items():
+            rows.append({
+                "season_id": s_id,
+                "tournaments": season["tournaments"],
+                "purse": season["purse"],
+                "avg_win_total": (season["win_total_sum"] / season["win_total_count"]
+                                  if season["win_total_count"] else None),
+                "distinct_winners": len(season["winners"]),
+            })
+
+        columns = ["season_id", "tournaments", "purse", "avg_win_total", "distinct_winners"]
+
+        return pd.DataFrame(rows, columns=columns).set_index("season_id").sort_index()
+
+    def player_season_wins(self, w_id):
+        """Wins per season for a single player.
+
+        Parameters
+        ----------
+        w_id : str
+            Winner identifier.
+
+        Returns
+        -------
+        dict
+            Number of wins keyed by season_id.
+
+        Examples
+        --------
+        >>> t_agg.player_season_wins("4848")
+        {"2018": 1}
+        """
+        winner = self.winners.get(str(w_id))
+        if winner is None:
+            return {}
+
+        return dict(winner["season_wins"])
+
+    def save(self, f_name="tournament_aggregates.json"):
+        """Persist aggregates so restarts do not rebuild them.
+
+        The file is written next to its final name and renamed into place.
+
+        Parameters
+        ----------
+        f_name : str
+            File name within path_config.TOURNAMENT_AGGREGATES, or a full path.
+
+        Examples
+        --------
+        >>> t_agg.save()
+        """
+        file_path = Path(path_config.TOURNAMENT_AGGREGATES, f_name)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        state = {
+            "tournaments": self.tournaments,
+            "winners": self.winners,
+            "seasons": self.seasons,
+            "total_tournaments": self.total_tournaments,
+            "total_purse": self.total_purse,
+        }
+
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+
+        tmp_path.replace(file_path)
+
+    @classmethod
+    def load(cls, f_name="tournament_aggregates.json"):
+        """Load persisted aggregates, or start empty if none exist.
+
+        Parameters
+        ----------
+        f_name : str
+            File name within path_config.TOURNAMENT_AGGREGATES, or a full path.
+
+        Returns
+        -------
+        TournamentAggregates
+            Aggregates restored from disk.
+
+        Examples
+        --------
+        >>> t_agg = TournamentAggregates.load()
+        >>> t_agg.update(new_df)
+        >>> t_agg.save()
+        """
+        t_agg = cls()
+
+        file_path = Path(path_config.TOURNAMENT_AGGREGATES, f_name)
+        if not file_path.exists():
+            return t_agg
+
+        with open(file_path) as f:
+            state = json.load(f)
+
+        t_agg.tournaments = state["tournaments"]
+        t_agg.winners = state["winners"]
+        t_agg.seasons = state["seasons"]
+        t_agg.total_tournaments = state["total_tournaments"]
+        t_agg.total_purse = state["total_purse"]
+
+        return t_agg
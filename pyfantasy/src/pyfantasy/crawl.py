@@ -0,0 +1,110 @@
+from time import monotonic
+
+from fetch_pool import FetchPool
+from tournament import EspnSeason, TOURS, save_season_data
+
+
+class CrawlPlan():
+    """Crawl seasons of several tours through one shared fetch pool.
+
+    Schedule pages of every tour are fetched together, then every
+    tournament of every tour, so all requests share the pool's workers and
+    rate budget instead of running one tour after another.
+
+    Parameters
+    ----------
+    start : int
+        First season.
+
+    end : int, optional
+        Last season, inclusive.
+
+    tours : list of str, optional
+        Tours to crawl, all of TOURS when not given.
+
+    max_workers : int
+        Concurrent requests across all tours.
+
+    rate : float, optional
+        Requests per second across all tours.
+
+    source_cls : type, optional
+        Data source class for the seasons, built with the pool as session.
+    """
+
+    def __init__(self, start, end=None, tours=None, max_workers=8, rate=None, source_cls=None) -> None:
+        if tours is None:
+            tours = list(TOURS)
+
+        self.pool = FetchPool(max_workers=max_workers, rate=rate)
+
+        self.seasons = {}
+        for tour in tours:
+            source = source_cls(session=self.pool) if source_cls is not None else None
+            self.seasons[tour] = EspnSeason(start, end, source=source, tour=tour, session=self.pool)
+
+    def run(self, fields=None, deadline=None, today=None):
+        """Retrieve every season of every tour.
+
+        Jobs of all tours share one priority order, so in progress and
+        recent tournaments of every tour are fetched before older ones.
+
+        Parameters
+        ----------
+        fields : list of str, optional
+            Tournament fields needed. All fields when not given.
+
+        deadline : float, optional
+            Seconds this run may spend starting new fetches.
+
+        today : date, optional
+            Reference date for priorities, date.today() when not given.
+
+        Returns
+        -------
+        dict
+            Urls skipped because of the deadline or an error, keyed by tour.
+
+        Examples
+        --------
+        >>> c_plan = CrawlPlan(2018, 2021, tours=["pga", "lpga"], rate=5)
+        >>> c_plan.run()
+        >>> c_plan.save()
+        """
+        if deadline is not None:
+            deadline = monotonic() + deadline
+
+        schedule_jobs = {tour: e_season.schedule_jobs(deadline) for tour, e_season in self.seasons.items()}
+        self.pool.run_jobs([job for jobs in schedule_jobs.values() for job in jobs])
+
+        tournament_jobs = {tour: e_season.tournament_jobs(schedule_jobs[tour], fields, deadline, today)
+                           for tour, e_season in self.seasons.items()}
+        self.pool.run_jobs([job for jobs in tournament_jobs.values() for job in jobs])
+
+        return {tour: e_season.collect_jobs(schedule_jobs[tour], tournament_jobs[tour])
+                for tour, e_season in self.seasons.items()}
+
+    def save(self, optimize_dtypes=False, sharded=False):
+        """Save raw and cleaned outputs, one set per tour.
+
+        Returns
+        -------
+        dict
+            CleanTournaments keyed by tour.
+        """
+        return {tour: save_season_data(e_season, optimize_dtypes=optimize_dtypes, sharded=sharded)
+                for tour, e_season in self.seasons.items()}
+
+    def close(self):
+        self.pool.close()
+
+
+def crawl_runner(start, end=None, tours=None, max_workers=8, rate=None, optimize_dtypes=False, sharded=False):
+
+    c_plan = CrawlPlan(start, end, tours=tours, max_workers=max_workers, rate=rate)
+
+    try:
+        c_plan.run()
+        c_plan.save(optimize_dtypes=optimize_dtypes, sharded=sharded)
+    finally:
+        c_plan.close()
@@ -0,0 +1,209 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+class RateLimiter():
+    """Token bucket shared by every thread fetching through a pool.
+
+    Parameters
+    ----------
+    rate : float
+        Requests per second allowed on average.
+
+    burst : int, optional
+        Requests allowed back to back. Defaults to rate rounded up.
+    """
+
+    def __init__(self, rate, burst=None) -> None:
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, int(rate + 0.5))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class FetchJob():
+    """Unit of work for FetchPool.run_jobs.
+
+    Parameters
+    ----------
+    fn : callable
+        Function to run.
+
+    args : tuple
+        Arguments for fn.
+
+    priority : tuple or float
+        Lower runs first.
+
+    deadline : float, optional
+        time.monotonic() value after which the job is skipped if it has not
+        started.
+    """
+
+    def __init__(self, fn, args=(), priority=0, deadline=None) -> None:
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.deadline = deadline
+
+        self.result = None
+        self.error = None
+        self.done = False
+        self.skipped = False
+
+    def expired(self, now):
+        return self.deadline is not None and now >= self.deadline
+
+
+class FetchPool():
+    """Thread pool with one rate budget for every request made through it.
+
+    A FetchPool can be passed as the session of EspnSeason and its sources:
+    get() is rate limited and reuses a connection per worker thread.
+
+    Parameters
+    ----------
+    max_workers : int
+        Concurrent requests.
+
+    rate : float, optional
+        Requests per second across all workers. Unlimited when not given.
+
+    timeout : float
+        Seconds before a request is abandoned.
+    """
+
+    def __init__(self, max_workers=8, rate=None, timeout=30) -> None:
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate) if rate is not None else None
+        self.timeout = timeout
+
+        self.local = threading.local()
+        self.sessions = []
+        self.sessions_lock = threading.Lock()
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def session(self):
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self.local.session = session
+            with self.sessions_lock:
+                self.sessions.append(session)
+
+        return session
+
+    def get(self, url):
+        """Rate limited GET request.
+
+        Examples
+        --------
+        >>> f_pool = FetchPool(max_workers=8, rate=5)
+        >>> page = f_pool.get("https://www.espn.com/golf/schedule/_/season/2018")
+        """
+        if self.limiter is not None:
+            self.limiter.acquire()
+
+        return self.session().get(url, timeout=self.timeout)
+
+    def map(self, fn, *iterables):
+        """Run fn over iterables on the pool.
+
+        Returns
+        -------
+        list
+            Results in input order.
+
+        Examples
+        --------
+        >>> f_pool.map(e_season.retrieve_schedule, e_season.season_urls)
+        """
+        return list(self.executor.map(fn, *iterables))
+
+    def run_jobs(self, jobs):
+        """Run jobs on the pool, highest priority first.
+
+        Workers always pick the pending job with the lowest priority value.
+        Jobs whose deadline passes before they start are skipped, so a time
+        boxed run spends its budget on the most valuable jobs. Jobs already
+        running when a deadline passes are allowed to finish.
+
+        Parameters
+        ----------
+        jobs : list of FetchJob
+            Jobs to run. Results are set on the jobs.
+
+        Returns
+        -------
+        list of FetchJob
+            The jobs, in the order given.
+
+        Examples
+        --------
+        >>> jobs = [FetchJob(fetch, (t_url,), priority=p, deadline=d) for p, t_url in ranked_urls]
+        >>> f_pool.run_jobs(jobs)
+        """
+        counter = itertools.count()
+        heap = [(job.priority, next(counter), job) for job in jobs]
+        heapq.heapify(heap)
+        heap_lock = threading.Lock()
+
+        def work():
+            while True:
+                with heap_lock:
+                    if not heap:
+                        return
+                    _, _, job = heapq.heappop(heap)
+
+                if job.expired(time.monotonic()):
+                    job.skipped = True
+                    continue
+
+                try:
+                    job.result = job.fn(*job.args)
+                except Exception as e:
+                    job.error = e
+                job.done = True
+
+        workers = [self.executor.submit(work) for _ in range(min(self.max_workers, len(jobs)))]
+        for worker in workers:
+            worker.result()
+
+        return jobs
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+        with self.sessions_lock:
+            for session in self.sessions:
+                session.close()
+            self.sessions.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -7,6 +7,14 @@ DATA = Path(BASE, "data")
 TOURNAMENT_DATA = Path(DATA, "tournaments")
 RAW_TOURNAMENTS = Path(TOURNAMENT_DATA, "raw")
 PROCESSED_TOURNAMENTS = Path(TOURNAMENT_DATA, "processed")
+TOURNAMENT_AGGREGATES = Path(TOURNAMENT_DATA, "aggregates")
+CRAWL_QUEUE = Path(TOURNAMENT_DATA, "crawl_queue.sqlite")
+TOURNAMENT_INDEX = Path(TOURNAMENT_DATA, "tournament_index.csv")
+QUARANTINE_TOURNAMENTS = Path(TOURNAMENT_DATA, "quarantine")
+
+TOURNAMENT_OVERRIDES = Path(BASE, "overrides.csv")
+
+PROFILES = Path(DATA, "profiles")
 
 DATA_RAW = Path(DATA, "raw")
 DATA_PROCESSED = Path(DATA, "processed")
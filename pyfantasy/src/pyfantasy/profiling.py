@@ -0,0 +1,353 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+
+class NullProfiler():
+    """Profiler used when profiling is off. Stages cost a method call."""
+
+    enabled = False
+
+    def __init__(self) -> None:
+        self.null_stage = nullcontext()
+
+    def stage(self, name):
+        return self.null_stage
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class StageProfiler():
+    """Per pipeline stage cProfile, tracemalloc and stack sampling.
+
+    Each stage entered through stage() gets its own cProfile stats, wall
+    time, peak traced memory and allocation sites. A sampling thread records
+    the stacks of threads inside a stage, written as collapsed stacks for
+    flamegraph tools. Nested stages pause their parent's cProfile, so
+    function stats belong to the innermost stage, while wall time, peak
+    memory and allocations of a stage include its nested stages.
+
+    tracemalloc snapshots cost time proportional to the traced heap, so
+    they are only taken around the first call of each stage name, with
+    their time left out of every stage's wall time. The snapshots are
+    diffed into allocation sites when the report is built, not during the
+    run.
+
+    tracemalloc tracks a single process wide peak. It is only reset while
+    one thread is inside stages, so with concurrent stages (workers > 1)
+    stage peaks are upper bounds that can include other threads' memory.
+    run_peak, the peak over the whole run, is exact either way.
+
+    Parameters
+    ----------
+    interval : float
+        Seconds between stack samples.
+
+    top : int
+        Functions and allocation sites listed per stage in the report.
+    """
+
+    enabled = True
+
+    def __init__(self, interval=0.005, top=20) -> None:
+        self.interval = interval
+        self.top = top
+
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # thread id -> stack of active stage names, read by the sampler
+        self.active = {}
+
+        self.stats = {}
+        self.calls = Counter()
+        self.wall = Counter()
+        self.peaks = {}
+        self.allocations = {}
+        # stage name -> (snapshot before, snapshot after) of its first call
+        self.snapshots = {}
+        self.samples = Counter()
+        self.run_peak = 0
+
+        self.sampler = None
+        self.running = False
+        self.started_tracemalloc = False
+
+    def start(self):
+        if self.running:
+            return
+
+        if not tracemalloc.is_tracing():
+            # allocation sites only need the allocating line
+            tracemalloc.start(1)
+            self.started_tracemalloc = True
+
+        self.running = True
+        self.sampler = threading.Thread(target=self.sample_loop, daemon=True)
+        self.sampler.start()
+
+    def stop(self):
+        if not self.running:
+            return
+
+        self.running = False
+        self.sampler.join()
+
+        if tracemalloc.is_tracing():
+            with self.lock:
+                self.update_run_peak()
+
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+    def sample_loop(self):
+        own_id = threading.get_ident()
+
+        while self.running:
+            frames = sys._current_frames()
+
+            with self.lock:
+                active = {t_id: list(stages) for t_id, stages in self.active.items() if stages}
+
+            for t_id, stages in active.items():
+                frame = frames.get(t_id)
+                if frame is None or t_id == own_id:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+
+                collapsed = ";".join([stages[-1]] + stack[::-1])
+                self.samples[collapsed] += 1
+
+            time.sleep(self.interval)
+
+    def frames(self):
+        frames = getattr(self.local, "frames", None)
+        if frames is None:
+            frames = []
+            self.local.frames = frames
+        return frames
+
+    def update_run_peak(self):
+        """Fold the current tracemalloc peak into run_peak, under lock."""
+        self.run_peak = max(self.run_peak, tracemalloc.get_traced_memory()[1])
+
+    def take_snapshot(self, frames):
+        """Snapshot traced memory, charging its time to frames as overhead."""
+        start = time.perf_counter()
+        snapshot = tracemalloc.take_snapshot()
+        overhead = time.perf_counter() - start
+
+        for record in frames:
+            record["overhead"] += overhead
+
+        return snapshot
+
+    @contextmanager
+    def stage(self, name):
+        """Profile the enclosed block as stage name.
+
+        Examples
+        --------
+        >>> profiler = StageProfiler()
+        >>> with profiler.stage("soup"):
+        ...     soup = BeautifulSoup(page.content, "html.parser")
+        """
+        frames = self.frames()
+        parent = frames[-1] if frames else None
+
+        if parent is not None:
+            self.pause(parent)
+
+        tracing = tracemalloc.is_tracing()
+
+        with self.lock:
+            snapshot_sites = tracing and name not in self.allocations
+            if snapshot_sites:
+                # claim the name so concurrent first calls snapshot once
+                self.allocations[name] = Counter()
+
+        record = {
+            "name": name,
+            "profile": cProfile.Profile(),
+            "profiling": False,
+            "snapshot": self.take_snapshot(frames) if snapshot_sites else None,
+            "memory": tracemalloc.get_traced_memory()[0],
+            "peak": 0,
+            "overhead": 0.0,
+        }
+
+        t_id = threading.get_ident()
+        with self.lock:
+            self.active.setdefault(t_id, []).append(name)
+
+            if tracing:
+                self.update_run_peak()
+                if not any(stages for other, stages in self.active.items() if other != t_id):
+                    tracemalloc.reset_peak()
+
+        frames.append(record)
+        record["start"] = time.perf_counter()
+        self.resume(record)
+
+        try:
+            yield
+        finally:
+            self.pause(record)
+            elapsed = time.perf_counter() - record["start"] - record["overhead"]
+            frames.pop()
+
+            with self.lock:
+                self.active[t_id].pop()
+
+            self.record(record, elapsed, frames)
+
+            if parent is not None:
+                self.resume(parent)
+
+    def pause(self, record):
+        if record["profiling"]:
+            record["profile"].disable()
+            record["profiling"] = False
+
+        if tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1] - record["memory"]
+            record["peak"] = max(record["peak"], peak)
+
+    def resume(self, record):
+        try:
+            record["profile"].enable()
+            record["profiling"] = True
+        except ValueError:
+            # another profiler is active on this interpreter, rely on samples
+            record["profiling"] = False
+
+    def record(self, record, elapsed, frames):
+        name = record["name"]
+
+        if record["snapshot"] is not None and tracemalloc.is_tracing():
+            snapshots = (record["snapshot"], self.take_snapshot(frames))
+            with self.lock:
+                self.snapshots[name] = snapshots
+
+        with self.lock:
+            self.calls[name] += 1
+            self.wall[name] += elapsed
+            self.peaks[name] = max(self.peaks.get(name, 0), record["peak"])
+
+            try:
+                if name in self.stats:
+                    self.stats[name].add(record["profile"])
+                else:
+                    self.stats[name] = pstats.Stats(record["profile"])
+            except TypeError:
+                # profile never enabled, nothing collected
+                pass
+
+    def allocation_sites(self, name):
+        """Bytes allocated per source line during the first call of a stage.
+
+        Returns
+        -------
+        Counter
+            Allocated bytes keyed by "file:line".
+        """
+        with self.lock:
+            snapshots = self.snapshots.pop(name, None)
+
+        if snapshots is not None:
+            before, after = snapshots
+            sites = Counter()
+            for diff in after.compare_to(before, "lineno"):
+                if diff.size_diff > 0:
+                    frame = diff.traceback[0]
+                    sites[f"{frame.filename}:{frame.lineno}"] += diff.size_diff
+
+            with self.lock:
+                self.allocations[name] = sites
+
+        return self.allocations.get(name, Counter())
+
+    def report(self):
+        """Per stage report of top functions, peak memory and allocations.
+
+        Returns
+        -------
+        str
+            Report text.
+        """
+        lines = [f"run peak memory: {self.run_peak / 1024:.1f} KiB", ""]
+
+        for name in sorted(self.calls, key=lambda name: -self.wall[name]):
+            lines.append(f"== stage {name} ==")
+            lines.append(f"calls: {self.calls[name]}  wall: {self.wall[name]:.3f}s  "
+                         f"peak memory: {self.peaks.get(name, 0) / 1024:.1f} KiB")
+
+            lines.append("top allocation sites (first call):")
+            for site, size in self.allocation_sites(name).most_common(self.top):
+                lines.append(f"  {size / 1024:10.1f} KiB  {site}")
+
+            if name in self.stats:
+                stream = io.StringIO()
+                stats = self.stats[name]
+                stats.stream = stream
+                stats.sort_stats("cumulative").print_stats(self.top)
+                lines.append("top functions:")
+                lines.append(stream.getvalue().strip())
+
+            lines.append("")
+
+        return "\n".join(lines)
+
+    def collapsed_stacks(self):
+        """Sampled stacks in collapsed format, one "stack count" per line."""
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(self.samples.items()))
+
+    def write_report(self, report_dir, prefix="profile"):
+        """Write the stage report and the collapsed stack file.
+
+        Parameters
+        ----------
+        report_dir : str or Path
+            Directory for the report files.
+
+        prefix : str
+            File name prefix.
+
+        Returns
+        -------
+        tuple of Path
+            Report and collapsed stack file paths.
+
+        Examples
+        --------
+        >>> profiler.write_report(path_config.PROFILES, "espn_tournaments_2018")
+        """
+        report_dir = Path(report_dir)
+        report_dir.mkdir(parents=True, exist_ok=True)
+
+        report_path = Path(report_dir, f"{prefix}_report.txt")
+        stacks_path = Path(report_dir, f"{prefix}_stacks.txt")
+
+        report_path.write_text(self.report())
+        stacks_path.write_text(self.collapsed_stacks())
+
+        return report_path, stacks_path
@@ -0,0 +1,418 @@
+import argparse
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pandas as pd
+
+import validation
+from tournament import EspnSeason, HtmlSource, LEADERBOARD_URL
+from tournament_index import TournamentIndex
+
+
+class SingleFlight():
+    """Coalesce concurrent calls for the same key into one execution."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """Run fn once for all concurrent callers of key.
+
+        Parameters
+        ----------
+        key : hashable
+            Identifier of the call, e.g. ("tournament", "3802").
+
+        fn : callable
+            Function without arguments producing the value.
+
+        Returns
+        -------
+        object
+            Value produced by fn. Callers that joined an in-flight call get
+            the same value, or the same exception is raised.
+
+        Examples
+        --------
+        >>> flight = SingleFlight()
+        >>> flight.do(("tournament", "3802"), lambda: fetch("3802"))
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "value": None, "error": None}
+                self.calls[key] = call
+
+        if not leader:
+            call["done"].wait()
+        else:
+            try:
+                call["value"] = fn()
+            except Exception as e:
+                call["error"] = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call["done"].set()
+
+        if call["error"] is not None:
+            raise call["error"]
+
+        return call["value"]
+
+
+class TournamentCache():
+    """In memory cache of query results with request coalescing.
+
+    Entries older than ttl seconds are served as is and refreshed by the
+    background refresher, so reads never wait on an upstream fetch once
+    a key has been loaded.
+    """
+
+    def __init__(self, ttl=3600) -> None:
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.loaders = {}
+        self.flight = SingleFlight()
+
+    def put(self, key, value, loader=None):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic())
+            if loader is not None:
+                self.loaders[key] = loader
+
+    def get(self, key, loader):
+        """Get a cached value, loading it once if missing.
+
+        Parameters
+        ----------
+        key : hashable
+            Cache key.
+
+        loader : callable
+            Function without arguments fetching the value upstream.
+
+        Returns
+        -------
+        object
+            Cached or freshly loaded value.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None:
+            return entry[0]
+
+        def fill():
+            # the previous flight may have stored the value after our miss
+            with self.lock:
+                entry = self.entries.get(key)
+            if entry is not None:
+                return entry[0]
+
+            return self.load(key, loader)
+
+        return self.flight.do(key, fill)
+
+    def load(self, key, loader):
+        """Load and store a value, run inside a flight so the value is
+        cached before the flight ends."""
+        value = loader()
+        self.put(key, value, loader)
+
+        return value
+
+    def values(self, kind):
+        with self.lock:
+            return [value for key, (value, _) in self.entries.items() if key[0] == kind]
+
+    def refresh_stale(self):
+        """Reload entries older than ttl.
+
+        Returns
+        -------
+        int
+            Number of entries refreshed.
+        """
+        now = time.monotonic()
+        with self.lock:
+            stale = [key for key, (_, fetched) in self.entries.items()
+                     if now - fetched > self.ttl and key in self.loaders]
+
+        refreshed = 0
+        for key in stale:
+            loader = self.loaders[key]
+            try:
+                self.flight.do(key, lambda: self.load(key, loader))
+                refreshed += 1
+            except Exception as e:
+                print(f"Error refreshing {key}: {e}")
+
+        return refreshed
+
+    def start_refresher(self, interval=None):
+        """Refresh stale entries from a daemon thread.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Seconds between refresh passes. Defaults to a tenth of ttl.
+
+        Returns
+        -------
+        threading.Thread
+            The refresher thread.
+        """
+        if interval is None:
+            interval = max(self.ttl / 10, 1)
+
+        def refresh_loop():
+            while True:
+                time.sleep(interval)
+                self.refresh_stale()
+
+        thread = threading.Thread(target=refresh_loop, daemon=True)
+        thread.start()
+
+        return thread
+
+
+def frame_records(df):
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+class TournamentService():
+
+    def __init__(self, source=None, ttl=3600, t_index=None, tour="pga") -> None:
+        if source is None:
+            source = HtmlSource()
+        if t_index is None:
+            t_index = TournamentIndex()
+
+        self.source = source
+        self.cache = TournamentCache(ttl=ttl)
+        self.t_index = t_index
+        self.tour = tour
+        self.index_lock = threading.Lock()
+        self.overrides = validation.load_overrides()
+
+    def load_csv(self, f_path):
+        """Seed the cache from a saved tournaments csv.
+
+        Parameters
+        ----------
+        f_path : str or Path
+            Raw or cleaned tournaments csv.
+
+        Returns
+        -------
+        int
+            Number of tournaments loaded.
+
+        Examples
+        --------
+        >>> t_service = TournamentService()
+        >>> t_service.load_csv("valid_tournaments_2015_2021.csv")
+        """
+        df = pd.read_csv(f_path, dtype={"tournament_id": str, "winner_id": str, "season_id": str})
+        records = validation.override_tournaments(frame_records(df), self.overrides)
+
+        for tournament_info in records:
+            t_id = tournament_info["tournament_id"]
+            loader = self.tournament_loader(t_id, tournament_info.get("season_id"))
+            self.cache.put(("tournament", t_id), tournament_info, loader)
+
+        return len(records)
+
+    def index_entry(self, t_id, t_date=None):
+        """Index entry of a tournament, reading schedules if it is missing.
+
+        Parameters
+        ----------
+        t_id : str
+            Tournament identifier.
+
+        t_date : str, optional
+            Tournament date. When the id is not indexed, the schedules of
+            the seasons that can hold this date are indexed on the service
+            tour.
+
+        Returns
+        -------
+        dict or None
+            Index entry, None if no schedule lists the tournament.
+        """
+        with self.index_lock:
+            entry = self.t_index.get(t_id)
+            if entry is not None or not t_date:
+                return entry
+
+            year = pd.to_datetime(t_date, errors="coerce").year
+            if pd.isna(year):
+                return None
+
+            try:
+                # seasons can start in the fall of the previous calendar year
+                if self.t_index.update(year, year + 1, tour=self.tour, refresh_latest=False):
+                    self.t_index.save()
+            except Exception as e:
+                print(f"Error indexing seasons {year}-{year + 1}: {e}")
+
+            return self.t_index.get(t_id)
+
+    def tournament_loader(self, t_id, s_id=None):
+        def load():
+            t_url = f"{LEADERBOARD_URL}{t_id}"
+            season_id = s_id
+
+            entry = self.index_entry(t_id) if season_id is None else None
+            if entry is not None:
+                t_url, season_id = entry["t_url"], entry["season_id"]
+
+            espn_t = self.source.fetch_tournament(t_url, season_id)
+            if espn_t is None:
+                raise LookupError(f"Tournament {t_id} could not be retrieved")
+
+            if season_id is None:
+                entry = self.index_entry(t_id, espn_t.get_date())
+                if entry is not None:
+                    espn_t.set_season_id(entry["season_id"])
+
+            return validation.override_tournaments([dict(espn_t.tournament_info)], self.overrides)[0]
+
+        return load
+
+    def season_loader(self, s_id):
+        def load():
+            e_season = EspnSeason(int(s_id), source=self.source, tour=self.tour)
+            e_season.retrieve_all_seasons()
+
+            records = [dict(espn_t.tournament_info) for espn_t in e_season.season_data]
+            validation.override_tournaments(records, self.overrides)
+            for tournament_info in records:
+                t_id = tournament_info["tournament_id"]
+                self.cache.put(("tournament", t_id), tournament_info, self.tournament_loader(t_id, s_id))
+
+            return records
+
+        return load
+
+    def tournament(self, t_id):
+        """Tournament information for a tournament id.
+
+        Examples
+        --------
+        >>> t_service.tournament("3802")
+        """
+        t_id = str(t_id)
+        return self.cache.get(("tournament", t_id), self.tournament_loader(t_id))
+
+    def season(self, s_id):
+        """Tournaments of a season.
+
+        Examples
+        --------
+        >>> t_service.season("2018")
+        """
+        s_id = str(s_id)
+        return self.cache.get(("season", s_id), self.season_loader(s_id))
+
+    def winner(self, w_id):
+        """Cached tournaments won by a player.
+
+        Only tournaments already in the cache are searched, winner queries
+        never trigger a crawl.
+
+        Examples
+        --------
+        >>> t_service.winner("4848")
+        """
+        w_id = str(w_id)
+        wins = [tournament_info for tournament_info in self.cache.values("tournament")
+                if str(tournament_info["winner_id"]) == w_id]
+
+        return sorted(wins, key=lambda tournament_info: str(tournament_info["tournament_id"]))
+
+    def handler(self):
+        t_service = self
+
+        class TournamentHandler(BaseHTTPRequestHandler):
+
+            routes = {
+                "tournaments": t_service.tournament,
+                "seasons": t_service.season,
+                "winners": t_service.winner,
+            }
+
+            def do_GET(self):
+                parts = [part for part in self.path.split("?")[0].split("/") if part]
+
+                if len(parts) != 2 or parts[0] not in self.routes:
+                    return self.send_json(404, {"error": f"Unknown path {self.path}"})
+
+                try:
+                    body = self.routes[parts[0]](parts[1])
+                except LookupError as e:
+                    return self.send_json(404, {"error": str(e)})
+                except Exception as e:
+                    return self.send_json(502, {"error": str(e)})
+
+                self.send_json(200, body)
+
+            def send_json(self, status, body):
+                content = json.dumps(body, default=str).encode()
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        return TournamentHandler
+
+    def serve(self, host="127.0.0.1", port=8765, refresh=True):
+        """Serve tournament, season and winner queries over http.
+
+        Routes are /tournaments/<tournament_id>, /seasons/<season_id> and
+        /winners/<winner_id>.
+
+        Examples
+        --------
+        >>> t_service = TournamentService()
+        >>> t_service.serve()
+        """
+        server = ThreadingHTTPServer((host, port), self.handler())
+
+        if refresh:
+            self.cache.start_refresher()
+
+        print(f"Serving tournament data on http://{host}:{server.server_port}")
+        server.serve_forever()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Local tournament query service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttl", type=int, default=3600, help="seconds before cached entries are refreshed")
+    parser.add_argument("--csv", nargs="*", default=[], help="tournament csv files to preload")
+    parser.add_argument("--tour", default="pga", help="tour of season queries and schedules indexed")
+
+    args = parser.parse_args()
+
+    t_service = TournamentService(ttl=args.ttl, tour=args.tour)
+    for f_path in args.csv:
+        t_service.load_csv(f_path)
+
+    t_service.serve(args.host, args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import writer
+
+import pandas as pd
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError("Arrow export needs pyarrow, install it with `pip install pyfantasy[arrow]`") from e
+
+    return pyarrow
+
+
+def export_arrow(df, f_path):
+    """Publish a dataframe as an uncompressed Arrow IPC (Feather v2) file.
+
+    Uncompressed files can be memory mapped by any number of processes,
+    which then share the page cache copy instead of each parsing a csv.
+    Writing to a path on /dev/shm keeps the file in shared memory.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Tournament data, e.g. CleanTournaments.cleaned_df.
+
+    f_path : str or Path
+        Arrow file path.
+
+    Examples
+    --------
+    >>> export_arrow(clean_tourn.cleaned_df, Path(path_config.PROCESSED_TOURNAMENTS, "valid_tournaments_2018.arrow"))
+    """
+    pa = import_pyarrow()
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    writer.atomic_write(f_path, lambda tmp_name: pa.feather.write_feather(table, tmp_name, compression="uncompressed"))
+
+
+def load_arrow(f_path):
+    """Memory map an Arrow IPC file as an Arrow table without copying.
+
+    Parameters
+    ----------
+    f_path : str or Path
+        Arrow file written by export_arrow.
+
+    Returns
+    -------
+    pyarrow.Table
+        Table whose buffers point into the memory mapped file.
+
+    Examples
+    --------
+    >>> table = load_arrow("valid_tournaments_2018.arrow")
+    """
+    pa = import_pyarrow()
+
+    source = pa.memory_map(str(f_path), "r")
+
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_shared_frame(f_path):
+    """Memory map an Arrow IPC file as a dataframe without copying.
+
+    Columns use pandas ArrowDtype, so they keep pointing at the mapped
+    buffers instead of being converted to numpy.
+
+    Parameters
+    ----------
+    f_path : str or Path
+        Arrow file written by export_arrow.
+
+    Returns
+    -------
+    pd.DataFrame
+        Arrow backed tournament data.
+
+    Examples
+    --------
+    >>> df = load_shared_frame("valid_tournaments_2018.arrow")
+    """
+    return load_arrow(f_path).to_pandas(types_mapper=pd.ArrowDtype)
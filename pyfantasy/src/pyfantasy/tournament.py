@@ -1,14 +1,133 @@
 import os
 from pathlib import Path
+import re
 import sys
-from time import strptime
+from datetime import date, datetime
+from time import monotonic, strptime
 import path_config
+import profiling
+import shared_data
+import validation
+import writer
+from fetch_pool import FetchJob, FetchPool
 
 import requests
 from bs4 import BeautifulSoup
 
 import pandas as pd
 
+LEADERBOARD_URL = "https://www.espn.com/golf/leaderboard?tournamentId="
+SCHEDULE_URL = "https://www.espn.com/golf/schedule/_/season/"
+
+# Days after its start date a tournament is treated as in progress.
+IN_PROGRESS_DAYS = 4
+
+# Seconds before a request is abandoned, also bounds how long a deadline
+# run can overrun on a fetch it already started.
+REQUEST_TIMEOUT = 30
+
+# Tours covered, mapped to ESPN's schedule url slug.
+TOURS = {
+    "pga": "pga",
+    "lpga": "lpga",
+    "dpworld": "eur",
+    "champions": "champions-tour",
+}
+
+# Tournament fields available from the season schedule table alone.
+SCHEDULE_FIELDS = [
+    "tournament_id",
+    "tournament_name",
+    "tournament_date",
+    "tournament_purse",
+    "winner_name",
+    "winner_id",
+    "season_id",
+]
+
+# Column dtypes for the optimized tournament schema. Names and repeating ids
+# become categoricals; tournament_id is unique per row so it is stored as a
+# nullable integer rather than a category.
+OPTIMIZED_DTYPES = {
+    "tournament_id": "Int64",
+    "tournament_name": "category",
+    "tournament_purse": "Int64",
+    "win_total": "Int32",
+    "tournament_size": "Int32",
+    "winner_name": "category",
+    "winner_id": "category",
+    "season_id": "category",
+}
+
+
+def optimize_tournament_dtypes(df):
+    """Convert a tournament dataframe to the optimized schema.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Tournament data, e.g. from EspnSeason.feed_season_data.
+
+    Returns
+    -------
+    pd.DataFrame
+        Copy of df using OPTIMIZED_DTYPES and a datetime tournament_date.
+
+    Examples
+    --------
+    >>> optimized_df = optimize_tournament_dtypes(df)
+    """
+    optimized_df = df.copy()
+
+    for col, dtype in OPTIMIZED_DTYPES.items():
+        if col not in optimized_df.columns:
+            continue
+
+        if dtype == "category":
+            optimized_df[col] = optimized_df[col].astype("category")
+        else:
+            optimized_df[col] = pd.to_numeric(optimized_df[col], errors="coerce").astype(dtype)
+
+    if "tournament_date" in optimized_df.columns:
+        optimized_df["tournament_date"] = pd.to_datetime(optimized_df["tournament_date"])
+
+    return optimized_df
+
+
+def memory_report(df, optimized_df=None):
+    """Report per column memory usage before and after optimization.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Tournament data before optimization.
+
+    optimized_df : pd.DataFrame, optional
+        Tournament data after optimization. Computed from df when not given.
+
+    Returns
+    -------
+    pd.DataFrame
+        Bytes per column before and after, with a total row.
+
+    Examples
+    --------
+    >>> report = memory_report(df)
+    >>> report.loc["total"]
+    """
+    if optimized_df is None:
+        optimized_df = optimize_tournament_dtypes(df)
+
+    report = pd.DataFrame({
+        "before": df.memory_usage(index=False, deep=True),
+        "after": optimized_df.memory_usage(index=False, deep=True),
+    })
+    report.loc["total"] = report.sum()
+    report["saved"] = report["before"] - report["after"]
+
+    return report
+
+
 class EspnTournament():
 
     def __init__(self) -> None:
@@ -144,6 +263,11 @@ class EspnTournament():
         str
             Reformatted ESPN date.
 
+        Raises
+        ------
+        ValueError
+            If the date does not have a month and day.
+
         Examples
         --------
         >>> espn_t = EspnTournament()
@@ -156,6 +280,8 @@ class EspnTournament():
         month_and_day = self.parse_espn_dates(date, "-")
         
         day = self.parse_espn_dates(month_and_day, " ", b_identifier=False)
+        if day is None:
+            raise ValueError(f"Could not parse tournament date: {date}")
         day = day.lstrip()
         
         month = self.parse_espn_dates(month_and_day, " ", b_identifier=True)
@@ -182,7 +308,12 @@ class EspnTournament():
         >>> espn_t.set_date(tourn_meta)
         """
         tourn_date = tourn_meta.find("span").text
-        t_date = self.date_parser(tourn_date)
+        try:
+            t_date = self.date_parser(tourn_date)
+        except ValueError as e:
+            # left for the validation stage to quarantine
+            print(e)
+            t_date = None
         self.tournament_info["tournament_date"] = t_date
 
     def get_tournament_purse(self):
@@ -338,20 +469,366 @@ class EspnTournament():
         self.tournament_info["season_id"] = s_id
 
 
+def schedule_url(season, tour="pga"):
+    """Schedule url of a season on a tour.
+
+    Parameters
+    ----------
+    season : int
+        Season identifier.
+
+    tour : str
+        Tour name, one of TOURS.
+
+    Returns
+    -------
+    str
+        ESPN schedule url.
+
+    Examples
+    --------
+    >>> schedule_url(2018, "lpga")
+    "https://www.espn.com/golf/schedule/_/season/2018/tour/lpga"
+    """
+    if tour == "pga":
+        return f"{SCHEDULE_URL}{season}"
+
+    return f"{SCHEDULE_URL}{season}/tour/{TOURS[tour]}"
+
+
+def http_get(session, url):
+    """GET url through session, or a one-off session, with a timeout.
+
+    Parameters
+    ----------
+    session : requests.Session or FetchPool, optional
+        Session to reuse. A FetchPool applies its own timeout.
+
+    url : str
+        Url to fetch.
+
+    Examples
+    --------
+    >>> page = http_get(None, "https://www.espn.com/golf/schedule/_/season/2018")
+    """
+    if isinstance(session, FetchPool):
+        return session.get(url)
+
+    if session is not None:
+        return session.get(url, timeout=REQUEST_TIMEOUT)
+
+    with requests.Session() as session:
+        return session.get(url, timeout=REQUEST_TIMEOUT)
+
+
+def season_id_from_url(season_url):
+    """Season identifier of a schedule url.
+
+    Examples
+    --------
+    >>> season_id_from_url("https://www.espn.com/golf/schedule/_/season/2018/tour/lpga")
+    "2018"
+    """
+    return re.search(r"/season/(\d+)", season_url).group(1)
+
+
+class HtmlSource():
+    """Tournament data source scraping the ESPN leaderboard page."""
+
+    def __init__(self, session=None) -> None:
+        self.session = session
+        self.profiler = profiling.NULL_PROFILER
+
+    def get(self, url):
+        return http_get(self.session, url)
+
+    def fetch_tournament(self, t_url, s_id):
+        """Fetch tournament information from the leaderboard html.
+
+        Parameters
+        ----------
+        t_url : str
+            Tournament url to extract information.
+
+        s_id : int
+            Season identifier.
+
+        Returns
+        -------
+        EspnTournament or None
+            Tournament information, None if the page could not be retrieved.
+
+        Examples
+        --------
+        >>> html_source = HtmlSource()
+        >>> tournament_url = "https://www.espn.com/golf/leaderboard?tournamentId=3802"
+        >>> espn_t = html_source.fetch_tournament(tournament_url, 2018)
+        """
+        with self.profiler.stage("fetch"):
+            page = self.get(t_url)
+
+        if page.status_code != 200:
+            return None
+
+        with self.profiler.stage("soup"):
+            soup = BeautifulSoup(page.content, "html.parser")
+
+        with self.profiler.stage("extract"):
+            return self.extract_tournament(soup, t_url, s_id)
+
+    def extract_tournament(self, soup, t_url, s_id):
+        espn_t = EspnTournament()
+
+        header = soup.find("div", class_="Leaderboard__Header")
+
+        mt4 = header.find_all("div", class_="mt4")
+        tourn_meta = mt4[-1]
+
+        espn_t.set_tournament_id(t_url)
+
+        espn_t.set_tournament_name(tourn_meta)
+        
+        espn_t.set_date(tourn_meta)
+
+        espn_t.set_tournament_purse(header)
+        
+        # Table's on webpage. index with -1 in case of playoff table
+        tourn_tables = soup.select("div.ResponsiveTable")
+        if tourn_tables:
+            # win_total, tournamnet_size, winner_name, winner_id
+            tourn_table = tourn_tables[-1]
+
+            tourn_body = tourn_table.find("tbody", class_="Table__TBODY")
+
+            espn_t.set_winning_score(tourn_body)
+
+            espn_t.set_tournament_size(tourn_body)
+            
+            espn_t.set_winner_name(tourn_body)
+            
+            espn_t.set_winner_id(tourn_body)
+
+            espn_t.set_season_id(s_id)
+                
+        else:
+            print(f"No div.ResponsiveTable, (Tournament {espn_t.get_tournament_id()} Cancelled)")
+
+            espn_t.set_all_missing()
+            espn_t.set_season_id(s_id)
+
+        return espn_t
+
+
+class JsonSource():
+    """Tournament data source reading ESPN's structured event json.
+
+    The json payload is a fraction of the leaderboard html and needs no DOM
+    parsing. Events the api cannot serve are fetched from fallback, the
+    HtmlSource by default.
+    """
+
+    API_URL = "https://site.web.api.espn.com/apis/site/v2/sports/golf/leaderboard"
+
+    # Rounds assumed when the payload does not tell.
+    REGULATION_ROUNDS = 4
+
+    def __init__(self, api_url=API_URL, fallback=None, session=None) -> None:
+        self.api_url = api_url
+        self.session = session
+        self.profiler = profiling.NULL_PROFILER
+
+        if fallback is None:
+            fallback = HtmlSource(session=session)
+        self.fallback = fallback
+
+    def get(self, url):
+        return http_get(self.session, url)
+
+    def event_url(self, t_id):
+        return f"{self.api_url}?event={t_id}"
+
+    def regulation_rounds(self, event, competitors, winner):
+        """Number of regulation rounds of an event.
+
+        Taken from numberOfRounds when the payload has it. Otherwise it is
+        the most rounds played by a competitor outside the winner's tie,
+        since only tied leaders play a playoff.
+
+        Examples
+        --------
+        >>> json_source.regulation_rounds(event, competitors, winner)
+        5
+        """
+        competition = (event.get("competitions") or [{}])[0]
+        for holder in (event.get("tournament") or {}, competition):
+            if holder.get("numberOfRounds"):
+                return int(holder["numberOfRounds"])
+
+        winner_score = (winner.get("score") or {}).get("displayValue")
+        played = [len(c.get("linescores") or []) for c in competitors
+                  if (c.get("score") or {}).get("displayValue") != winner_score]
+
+        return max(played) if played else self.REGULATION_ROUNDS
+
+    def parse_event(self, payload, t_id, s_id):
+        """Map an ESPN event payload onto EspnTournament fields.
+
+        Parameters
+        ----------
+        payload : dict
+            Decoded json payload holding an events list.
+
+        t_id : str
+            Tournament identifier.
+
+        s_id : int
+            Season identifier.
+
+        Returns
+        -------
+        EspnTournament or None
+            Tournament information, None if the payload holds no event.
+
+        Examples
+        --------
+        >>> json_source = JsonSource()
+        >>> espn_t = json_source.parse_event(payload, "3802", 2018)
+        """
+        events = payload.get("events")
+        if not events:
+            return None
+
+        event = events[0]
+
+        espn_t = EspnTournament()
+        espn_t.tournament_info["tournament_id"] = str(t_id)
+        espn_t.tournament_info["tournament_name"] = event.get("name", "")
+
+        start_date = datetime.strptime(event["date"][:10], "%Y-%m-%d")
+        espn_t.tournament_info["tournament_date"] = f"{start_date.month}/{start_date.day}/{start_date.year}"
+
+        purse = event.get("purse")
+        if purse is None:
+            purse = event.get("displayPurse", "").replace("$", "").replace(",", "")
+        espn_t.tournament_info["tournament_purse"] = str(int(float(purse))) if purse else ""
+
+        espn_t.set_season_id(s_id)
+
+        competitions = event.get("competitions") or [{}]
+        competitors = competitions[0].get("competitors") or []
+
+        if not competitors:
+            print(f"No competitors, (Tournament {t_id} Cancelled)")
+            espn_t.set_all_missing()
+            return espn_t
+
+        winner = min(competitors, key=lambda c: c.get("sortOrder", float("inf")))
+
+        # regulation rounds only, playoff holes are reported as extra periods
+        n_rounds = self.regulation_rounds(event, competitors, winner)
+        rounds = [line.get("value") for line in winner.get("linescores", []) if line.get("period", 1) <= n_rounds]
+        rounds = [r for r in rounds if r is not None]
+        w_total = str(int(sum(rounds))) if rounds else None
+
+        espn_t.set_all_w(winner["athlete"]["displayName"], str(winner.get("id", winner["athlete"].get("id"))), w_total)
+        espn_t.tournament_info["tournament_size"] = len(competitors)
+
+        return espn_t
+
+    def fetch_tournament(self, t_url, s_id):
+        """Fetch tournament information from the event json.
+
+        Parameters
+        ----------
+        t_url : str
+            Tournament url, the tournament id is taken from it.
+
+        s_id : int
+            Season identifier.
+
+        Returns
+        -------
+        EspnTournament or None
+            Tournament information, None if neither json nor fallback
+            could retrieve it.
+
+        Examples
+        --------
+        >>> json_source = JsonSource()
+        >>> tournament_url = "https://www.espn.com/golf/leaderboard?tournamentId=3802"
+        >>> espn_t = json_source.fetch_tournament(tournament_url, 2018)
+        """
+        t_id = t_url[t_url.rfind("=") + 1:]
+
+        espn_t = None
+        try:
+            with self.profiler.stage("fetch"):
+                page = self.get(self.event_url(t_id))
+            if page.status_code == 200:
+                with self.profiler.stage("extract"):
+                    espn_t = self.parse_event(page.json(), t_id, s_id)
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            print(f"Error reading event json for tournament {t_id}: {e}")
+
+        if espn_t is None and self.fallback is not None:
+            return self.fallback.fetch_tournament(t_url, s_id)
+
+        return espn_t
+
+
 class EspnSeason():
 
-    def __init__(self, start, end=None) -> None:
-        b_url = "https://www.espn.com/golf/schedule/_/season/"
+    def __init__(self, start, end=None, source=None, tour="pga", session=None, profile=False) -> None:
+        if tour not in TOURS:
+            raise ValueError(f"Unknown tour {tour}, expected one of {list(TOURS)}")
+
         if end is not None:
-            season_urls = [b_url + str(season) for season in range(start, end+1)]
+            season_urls = [schedule_url(season, tour) for season in range(start, end+1)]
             self.end = end
         else:
-            season_urls = [f"{b_url}{start}"]
+            season_urls = [schedule_url(start, tour)]
             self.end = None
         
         self.start = start
+        self.tour = tour
         self.season_urls = season_urls
         self.season_data = []
+        # fields requested by the last retrieval, None for all fields
+        self.fields = None
+        self.session = session
+
+        if source is None:
+            source = HtmlSource(session=session)
+        self.source = source
+
+        if profile:
+            self.profiler = profiling.StageProfiler()
+            for stage_source in (source, getattr(source, "fallback", None)):
+                if stage_source is not None:
+                    stage_source.profiler = self.profiler
+        else:
+            self.profiler = profiling.NULL_PROFILER
+
+    def get(self, url):
+        return http_get(self.session, url)
+
+    def output_name(self, prefix):
+        """File name for season outputs, partitioned by tour.
+
+        PGA outputs keep their original names.
+
+        Examples
+        --------
+        >>> EspnSeason(2015, 2021, tour="lpga").output_name("valid_tournaments")
+        "valid_tournaments_lpga_2015_2021.csv"
+        """
+        if self.tour != "pga":
+            prefix = f"{prefix}_{self.tour}"
+
+        if self.end is not None:
+            return f"{prefix}_{self.start}_{self.end}.csv"
+
+        return f"{prefix}_{self.start}.csv"
     
     def retrieve_tournament_info(self, t_url, s_id):
         """Retrieve tournament information from tournament url and season id.
@@ -364,118 +841,429 @@ class EspnSeason():
         s_id : int
             Season identifier. 
 
+        Returns
+        -------
+        EspnTournament
+            Tournament appended to season_data.
+
         Examples
         --------
         >>> tournament_url = "https://www.espn.com/golf/leaderboard?tournamentId=3802"
         >>> espn_t.retrieve_tournament_info(tournament_url, 2017)
         """
         
-        espn_t = EspnTournament()
-        
-        with requests.Session() as session:
+        espn_t = self.source.fetch_tournament(t_url, s_id)
+        if espn_t is None:
+            espn_t = EspnTournament()
 
-            page = session.get(t_url)
+        self.season_data.append(espn_t)
 
-            if page.status_code == 200:
-                
-                soup = BeautifulSoup(page.content, "html.parser")
-                header = soup.find("div", class_="Leaderboard__Header")
+        return espn_t
 
-                mt4 = header.find_all("div", class_="mt4")
-                tourn_meta = mt4[-1]
+    def schedule_date(self, date, year):
+        """Reformat a schedule table date given its year.
 
-                espn_t.set_tournament_id(t_url)
+        Parameters
+        ----------
+        date : str
+            Schedule date without year (ex. 'Oct 19 - 22').
 
-                espn_t.set_tournament_name(tourn_meta)
-                
-                espn_t.set_date(tourn_meta)
+        year : int
+            Year the tournament starts in.
 
-                espn_t.set_tournament_purse(header)
-                
-                # Table's on webpage. index with -1 in case of playoff table
-                tourn_tables = soup.select("div.ResponsiveTable")
-                if tourn_tables:
-                    # win_total, tournamnet_size, winner_name, winner_id
-                    tourn_table = tourn_tables[-1]
+        Returns
+        -------
+        str
+            Reformatted start date.
+
+        Examples
+        --------
+        >>> espn_s = EspnSeason(2018)
+        >>> espn_s.schedule_date("Sep 28 - Oct 1", 2017)
+        "9/28/2017"
+        """
+        month_and_day = date.split("-")[0].split()
+        month_number = strptime(month_and_day[0][:3], "%b").tm_mon
+
+        return f"{month_number}/{month_and_day[1]}/{year}"
 
-                    tourn_body = tourn_table.find("tbody", class_="Table__TBODY")
+    def parse_schedule(self, content, s_id):
+        """Extract every field the season schedule table holds.
 
-                    espn_t.set_winning_score(tourn_body)
+        Schedule dates carry no year. Rows are in date order, so the year
+        starts at the season's first calendar year and moves on whenever the
+        month wraps around.
 
-                    espn_t.set_tournament_size(tourn_body)
-                    
-                    espn_t.set_winner_name(tourn_body)
-                    
-                    espn_t.set_winner_id(tourn_body)
+        Parameters
+        ----------
+        content : bytes
+            Season schedule page html.
 
-                    espn_t.set_season_id(s_id)
-                    
-                    if espn_t.get_tournament_id() == "2277":
+        s_id : str
+            Season identifier.
 
-                        espn_t.set_all_w("Scott Piercy", "1037", "265")
-                        
-                else:
-                    print(f"No div.ResponsiveTable, (Tournament {espn_t.get_tournament_id()} Cancelled)")
+        Returns
+        -------
+        list of tuple
+            (tournament url, EspnTournament) in schedule order. Leaderboard
+            only fields (win_total, tournament_size) are None.
+
+        Examples
+        --------
+        >>> espn_s = EspnSeason(2018)
+        >>> schedule = espn_s.parse_schedule(page.content, "2018")
+        """
+        with self.profiler.stage("soup"):
+            soup = BeautifulSoup(content, "html.parser")
+
+        with self.profiler.stage("schedule"):
+            return self.extract_schedule(soup, s_id)
+
+    def extract_schedule(self, soup, s_id):
+        season_table = soup.select("div.ResponsiveTable")
+        if not season_table:
+            return []
+
+        headers = [th.get_text(strip=True).lower() for th in season_table[0].find_all("th")]
+        columns = {name: idx for idx, name in enumerate(headers)}
+
+        season_body = season_table[0].find("tbody", class_="Table__TBODY")
+
+        schedule = []
+        year = None
+        prev_month = None
+
+        for row in season_body.find_all("tr"):
+            cells = row.find_all("td")
+
+            tournament = row.find("div", class_="eventAndLocation__innerCell")
+            if tournament is None or tournament.find("a") is None:
+                continue
+
+            tournament_url = tournament.find("a")
+            t_url = tournament_url["href"]
+
+            espn_t = EspnTournament()
+            espn_t.set_tournament_id(t_url)
+            espn_t.tournament_info["tournament_name"] = tournament_url.get_text(strip=True)
+            espn_t.set_season_id(s_id)
+
+            # win_total and tournament_size need the leaderboard
+            espn_t.set_all_missing()
+
+            date = cells[columns.get("dates", 0)].get_text(strip=True)
+            if date:
+                month = strptime(date[:3], "%b").tm_mon
+                if year is None:
+                    year = int(s_id) - 1 if month >= 9 else int(s_id)
+                elif month < prev_month:
+                    year += 1
+                prev_month = month
+
+                espn_t.tournament_info["tournament_date"] = self.schedule_date(date, year)
+
+            if "winner" in columns:
+                espn_t.set_winner_name(cells[columns["winner"]])
+                espn_t.set_winner_id(cells[columns["winner"]])
+
+            if "purse" in columns:
+                purse = cells[columns["purse"]].get_text(strip=True)
+                purse = purse.replace("$", "").replace(",", "")
+                espn_t.tournament_info["tournament_purse"] = purse if purse.isdigit() else ""
+
+            schedule.append((t_url, espn_t))
+
+        return schedule
+
+    def retrieve_schedule(self, season_url):
+        """Retrieve the season schedule table from season url.
+
+        Parameters
+        ----------
+        season_url : str
+            Season url to extract information.
+
+        Returns
+        -------
+        list of tuple
+            (tournament url, EspnTournament) in schedule order.
+
+        Examples
+        --------
+        >>> espn_s = EspnSeason(2018)
+        >>> season_url = "https://www.espn.com/golf/schedule/_/season/2018"
+        >>> schedule = espn_s.retrieve_schedule(season_url)
+        """
+        season_id = season_id_from_url(season_url)
 
-                    espn_t.set_all_missing()
-                    espn_t.set_season_id(s_id)
+        with self.profiler.stage("fetch"):
+            page = self.get(season_url)
+        if page.status_code == 200:
+            return self.parse_schedule(page.content, season_id)
 
-            self.season_data.append(espn_t)
+        print(f"Error retrieving page. page status code: {page.status_code}")
 
-    def retrieve_season(self, season_url):
+        return []
+
+    def season_tournament_urls(self, season_url):
+        """Retrieve tournament urls listed on a season schedule.
+
+        Parameters
+        ----------
+        season_url : str
+            Season url to extract tournament urls from.
+
+        Returns
+        -------
+        list of str
+            Tournament urls in schedule order.
+
+        Examples
+        --------
+        >>> espn_s = EspnSeason(2018)
+        >>> season_url = "https://www.espn.com/golf/schedule/_/season/2018"
+        >>> espn_s.season_tournament_urls(season_url)
+        """
+        return [t_url for t_url, _ in self.retrieve_schedule(season_url)]
+
+    def needs_leaderboard(self, fields):
+        return fields is None or not set(fields) <= set(SCHEDULE_FIELDS)
+
+    def retrieve_season(self, season_url, fields=None):
         """Retrieve season from season url.
+
+        Fields the schedule table holds come from a single schedule parse.
+        Leaderboards are only fetched when fields include one the schedule
+        does not have (win_total, tournament_size).
     
         Parameters
         ----------
         season_url : str
             Season url to extract information.
 
+        fields : list of str, optional
+            Tournament fields needed. All fields when not given.
+
         Examples
         --------
         >>> espn_s = EspnSeason(2018)
         >>> season_url = "https://www.espn.com/golf/schedule/_/season/2018"
         >>> espn_s.retrieve_season(season_url)
+        >>> espn_s.retrieve_season(season_url, fields=SCHEDULE_FIELDS)
         """
-        with requests.Session() as session:
+        season_id = season_id_from_url(season_url)
+        self.fields = fields
 
-            page = session.get(season_url)
-            if page.status_code == 200:
-                    
-                soup = BeautifulSoup(page.content, "html.parser")
+        for t_url, schedule_t in self.retrieve_schedule(season_url):
+            self.season_data.append(self.complete_tournament(t_url, season_id, schedule_t, fields))
 
-                season_table = soup.select("div.ResponsiveTable")
-                if season_table is not None:
-                    season_body = season_table[0].find("tbody", class_="Table__TBODY")
-                
-                tournaments = season_body.find_all("div", class_="eventAndLocation__innerCell")
-                
-                if tournaments is not None:
-                    for tournament in tournaments:
-                        tournament_url = tournament.find("a")
-                        if tournament_url:    
-                            t_url = tournament_url["href"]
-                            print(f"Fetching {t_url} data")
+    def complete_tournament(self, t_url, s_id, schedule_t, fields=None):
+        """Complete a schedule row from its leaderboard when fields need it.
+
+        Parameters
+        ----------
+        t_url : str
+            Tournament url.
 
-                            season_id = season_url[season_url.rfind("/")+1 :]
+        s_id : str
+            Season identifier.
 
-                            self.retrieve_tournament_info(t_url, season_id)
-            else:
-                print(f"Error retrieving page. page status code: {page.status_code}")
+        schedule_t : EspnTournament
+            Tournament as parsed from the schedule table.
+
+        fields : list of str, optional
+            Tournament fields needed. All fields when not given.
+
+        Returns
+        -------
+        EspnTournament
+            Leaderboard tournament with schedule values filling the fields it
+            left empty, or schedule_t if no leaderboard is needed.
+        """
+        if not self.needs_leaderboard(fields):
+            return schedule_t
+
+        print(f"Fetching {t_url} data")
+
+        espn_t = self.source.fetch_tournament(t_url, s_id)
+        if espn_t is None:
+            espn_t = EspnTournament()
+
+        # keep schedule values for fields the leaderboard did not give
+        for field, value in schedule_t.tournament_info.items():
+            if espn_t[field] == "" or espn_t[field] is None:
+                espn_t.tournament_info[field] = value
+
+        return espn_t
     
-    def retrieve_all_seasons(self):
+    def tournament_priority(self, schedule_t, today=None):
+        """Fetch priority of a scheduled tournament, lower is fetched first.
+
+        In progress tournaments come first, then finished ones from most to
+        least recent, then tournaments not yet started.
+
+        Parameters
+        ----------
+        schedule_t : EspnTournament
+            Tournament as parsed from the schedule table.
+
+        today : date, optional
+            Reference date, date.today() when not given.
+
+        Returns
+        -------
+        tuple
+            Sort key.
+
+        Examples
+        --------
+        >>> espn_s = EspnSeason(2018)
+        >>> espn_s.tournament_priority(schedule_t)
+        (1, -736621)
+        """
+        if today is None:
+            today = date.today()
+
+        t_date = schedule_t.get_date()
+        if not t_date:
+            return (3, 0)
+
+        start = datetime.strptime(t_date, "%m/%d/%Y").date()
+        days_since_start = (today - start).days
+
+        if days_since_start < 0:
+            return (2, start.toordinal())
+
+        if days_since_start <= IN_PROGRESS_DAYS:
+            return (0, -start.toordinal())
+
+        return (1, -start.toordinal())
+
+    def retrieve_all_seasons(self, fields=None, deadline=None, workers=1, today=None):
         """Retrieve all seasons set from constructor.
 
+        Fetches are scheduled by priority rather than url order: the most
+        recent season schedule first, then in progress and recent
+        tournaments before older finished ones. With a deadline, jobs not
+        started in time are skipped, so a time boxed run ends with the most
+        valuable data. Retrieved tournaments are kept in schedule order,
+        tournaments whose leaderboard was skipped or failed keep their
+        schedule row.
+        Every request times out after REQUEST_TIMEOUT seconds, so fetches
+        already running when the deadline passes end within that time.
+
+        Parameters
+        ----------
+        fields : list of str, optional
+            Tournament fields needed. All fields when not given.
+
+        deadline : float, optional
+            Seconds this run may spend starting new fetches.
+
+        workers : int
+            Concurrent fetches, unless the season session is a FetchPool.
+
+        today : date, optional
+            Reference date for priorities, date.today() when not given.
+
+        Returns
+        -------
+        list of str
+            Urls skipped because of the deadline or an error.
+
         Examples
         --------
         >>> espn_s = EspnSeason(2018)
         >>> espn_s.retrieve_all_seasons()
+        >>> espn_s.retrieve_all_seasons(fields=SCHEDULE_FIELDS)
+        >>> espn_s.retrieve_all_seasons(deadline=600, workers=8)
+        """
+        if deadline is not None:
+            deadline = monotonic() + deadline
+
+        if isinstance(self.session, FetchPool):
+            f_pool = self.session
+        else:
+            f_pool = FetchPool(max_workers=workers, timeout=REQUEST_TIMEOUT)
+
+        try:
+            schedule_jobs = f_pool.run_jobs(self.schedule_jobs(deadline))
+            tournament_jobs = f_pool.run_jobs(self.tournament_jobs(schedule_jobs, fields, deadline, today))
+        finally:
+            if f_pool is not self.session:
+                f_pool.close()
+
+        return self.collect_jobs(schedule_jobs, tournament_jobs)
+
+    def schedule_jobs(self, deadline=None):
+        """Schedule page jobs, most recent season first.
+
+        Returns
+        -------
+        list of FetchJob
+            One job per season url, in season order.
         """
-        for season in self.season_urls:
-            self.retrieve_season(season)
+        n_seasons = len(self.season_urls)
+
+        return [FetchJob(self.retrieve_schedule, (season_url,), (-1, n_seasons - idx), deadline)
+                for idx, season_url in enumerate(self.season_urls)]
 
-    def feed_season_data(self):
+    def tournament_jobs(self, schedule_jobs, fields=None, deadline=None, today=None):
+        """Prioritized tournament jobs from completed schedule jobs.
+
+        Returns
+        -------
+        list of FetchJob
+            One job per scheduled tournament, in schedule order.
+        """
+        self.fields = fields
+
+        jobs = []
+        for job in schedule_jobs:
+            if not job.done or job.error is not None:
+                continue
+
+            season_id = season_id_from_url(job.args[0])
+            for t_url, schedule_t in job.result:
+                priority = self.tournament_priority(schedule_t, today)
+                args = (t_url, season_id, schedule_t, fields)
+                jobs.append(FetchJob(self.complete_tournament, args, priority, deadline))
+
+        return jobs
+
+    def collect_jobs(self, schedule_jobs, tournament_jobs):
+        skipped = []
+
+        for job in schedule_jobs + tournament_jobs:
+            if job.error is not None:
+                print(f"Error retrieving {job.args[0]}: {job.error}")
+                skipped.append(job.args[0])
+            elif not job.done:
+                skipped.append(job.args[0])
+
+        # tournaments whose leaderboard was not fetched keep their schedule row
+        for job in tournament_jobs:
+            if job.done and job.error is None:
+                self.season_data.append(job.result)
+            else:
+                self.season_data.append(job.args[2])
+
+        if skipped:
+            print(f"Skipped {len(skipped)} fetches")
+
+        return skipped
+
+    def feed_season_data(self, optimize_dtypes=False, sharded=False):
         """Feed all season data held.
 
+        Parameters
+        ----------
+        optimize_dtypes : bool
+            Use the optimized schema (categoricals, nullable integers).
+
+        sharded : bool
+            Write per season shards with a manifest instead of one csv.
+
         Returns
         -------
         pd.DataFrame
@@ -489,23 +1277,27 @@ class EspnSeason():
         """
         if self.season_data is not None:
             
-            data = [tournament.tournament_info for tournament in self.season_data]
-            
-            df = pd.DataFrame(data)
-            df["tournament_purse"] = pd.to_numeric(df["tournament_purse"], downcast="integer")
-            df["win_total"] = pd.to_numeric(df["win_total"], downcast="integer")
-            df["tournament_date"] = pd.to_datetime(df["tournament_date"])
-            df.sort_values(by=["tournament_date", "season_id"], inplace=True)
-
-            if self.end is not None:
+            with self.profiler.stage("frame"):
+                data = [tournament.tournament_info for tournament in self.season_data]
+                validation.override_tournaments(data)
+                
+                df = pd.DataFrame(data)
+                df["tournament_purse"] = pd.to_numeric(df["tournament_purse"], errors="coerce", downcast="integer")
+                df["win_total"] = pd.to_numeric(df["win_total"], errors="coerce", downcast="integer")
+                df["tournament_date"] = pd.to_datetime(df["tournament_date"], errors="coerce")
+                if optimize_dtypes:
+                    df = optimize_tournament_dtypes(df)
+                df.sort_values(by=["tournament_date", "season_id"], inplace=True)
 
-                f_name = f"espn_tournaments_{self.start}_{self.end}.csv"
-            else:
-                f_name = f"espn_tournaments_{self.start}.csv"
+            f_name = self.output_name("espn_tournaments")
 
             file_path = Path(path_config.RAW_TOURNAMENTS, f_name)
 
-            df.to_csv(file_path, index=False)
+            with self.profiler.stage("write"):
+                if sharded:
+                    writer.write_shards(df, file_path.with_suffix(""))
+                else:
+                    writer.atomic_write_csv(df, file_path)
 
             return df
 
@@ -515,6 +1307,15 @@ class CleanTournaments():
     def __init__(self, df) -> None:
         self.df = df
         self.cleaned_df = pd.DataFrame()
+
+    def remove_unused_categories(self):
+        """Drop categories no longer present after filtering.
+
+        Keeps the optimized schema of the source dataframe while making sure
+        cleaned_df does not carry the names and ids of filtered rows.
+        """
+        for col in self.cleaned_df.select_dtypes(include="category").columns:
+            self.cleaned_df[col] = self.cleaned_df[col].cat.remove_unused_categories()
     
     def keep_valid_tournaments(self):
         """Filter for valid tournaments
@@ -534,6 +1335,7 @@ class CleanTournaments():
         valid_df = valid_df[~((valid_df["tournament_id"] == 401056542) | (valid_df["tournament_id"] == 401155476))]
 
         self.cleaned_df = valid_df
+        self.remove_unused_categories()
 
     def filter_tournaments(self):
         """Filter espn tournaments.
@@ -551,8 +1353,9 @@ class CleanTournaments():
         filtered_df = self.df[~self.df.winner_name.isnull()].copy()
         
         self.cleaned_df = filtered_df
+        self.remove_unused_categories()
 
-    def save_cleaned_tournaments(self, save_fname, valid_tourns=True):
+    def save_cleaned_tournaments(self, save_fname, valid_tourns=True, sharded=False, export_arrow=False):
         """Create subset of tournaments to save
         
         Args:
@@ -560,6 +1363,13 @@ class CleanTournaments():
 
             subset_path (str) : subset tournaments file name
 
+            sharded (bool) : write per season shards with a manifest,
+                in a directory named after save_fname
+
+            export_arrow (bool) : also publish an uncompressed Arrow IPC
+                file next to save_fname for zero copy loading with
+                shared_data.load_shared_frame
+
         """
 
         if valid_tourns == True:
@@ -572,27 +1382,83 @@ class CleanTournaments():
 
         cleaned_tourn_path = (Path(path_config.PROCESSED_TOURNAMENTS, save_fname))
 
-        self.cleaned_df.to_csv(cleaned_tourn_path, index=False)
+        if sharded:
+            writer.write_shards(self.cleaned_df, cleaned_tourn_path.with_suffix(""))
+        else:
+            writer.atomic_write_csv(self.cleaned_df, cleaned_tourn_path)
 
-def tournament_runner(start, end=None):
+        if export_arrow:
+            shared_data.export_arrow(self.cleaned_df, cleaned_tourn_path.with_suffix(".arrow"))
 
-    if end is not None:
-        e_season = EspnSeason(start, end)
-    else:
-        e_season = EspnSeason(start)
+def save_season_data(e_season, optimize_dtypes=False, sharded=False, export_arrow=False):
+    """Save raw and cleaned tournaments for a retrieved season.
 
-    e_season.retrieve_all_seasons()
+    Raw tournaments are validated before cleaning, against the fields the
+    season was retrieved with. Rows failing validation are saved to a
+    quarantine file instead of the cleaned tournaments.
 
-    tourn_df = e_season.feed_season_data()
+    Parameters
+    ----------
+    e_season : EspnSeason
+        Season holding retrieved tournaments in season_data.
 
-    if e_season.end is not None:
-        clean_end = e_season.end
-        clean_fn = f"valid_tournaments_{e_season.start}_{clean_end}.csv"
+    optimize_dtypes : bool
+        Use the optimized schema (categoricals, nullable integers).
+
+    sharded : bool
+        Write per season shards with a manifest instead of one csv.
+
+    export_arrow : bool
+        Also publish the cleaned tournaments as an Arrow IPC file.
+
+    Returns
+    -------
+    CleanTournaments
+        Cleaned tournaments that were saved.
+
+    Examples
+    --------
+    >>> e_season = EspnSeason(2018)
+    >>> e_season.retrieve_all_seasons()
+    >>> save_season_data(e_season)
+    """
+    tourn_df = e_season.feed_season_data(optimize_dtypes=optimize_dtypes, sharded=sharded)
+
+    clean_fn = e_season.output_name("valid_tournaments")
+    quarantine_fn = e_season.output_name("quarantine_tournaments")
+
+    with e_season.profiler.stage("validate"):
+        tourn_df, quarantine_df = validation.validate_tournaments(tourn_df, fields=e_season.fields)
+        if len(quarantine_df) > 0:
+            print(f"Quarantined {len(quarantine_df)} tournaments to {quarantine_fn}")
+            validation.save_quarantine(quarantine_df, quarantine_fn)
+
+    with e_season.profiler.stage("clean"):
+        clean_tourn = CleanTournaments(tourn_df)
+        clean_tourn.save_cleaned_tournaments(clean_fn, sharded=sharded, export_arrow=export_arrow)
+
+    return clean_tourn
+
+def tournament_runner(start, end=None, optimize_dtypes=False, sharded=False, tour="pga", deadline=None, workers=1,
+                      profile=False, export_arrow=False):
+
+    if end is not None:
+        e_season = EspnSeason(start, end, tour=tour, profile=profile)
     else:
-        clean_fn = f"valid_tournaments_{e_season.start}.csv"
+        e_season = EspnSeason(start, tour=tour, profile=profile)
 
-    clean_tourn = CleanTournaments(tourn_df)
-    clean_tourn.save_cleaned_tournaments(clean_fn) 
+    e_season.profiler.start()
+    try:
+        e_season.retrieve_all_seasons(deadline=deadline, workers=workers)
+
+        save_season_data(e_season, optimize_dtypes=optimize_dtypes, sharded=sharded, export_arrow=export_arrow)
+    finally:
+        e_season.profiler.stop()
+
+    if profile:
+        prefix = Path(e_season.output_name("profile")).stem
+        report_path, stacks_path = e_season.profiler.write_report(path_config.PROFILES, prefix)
+        print(f"Profile report written to {report_path}, collapsed stacks to {stacks_path}")
 
 def main():
     
@@ -0,0 +1,213 @@
+from pathlib import Path
+
+import path_config
+import validation
+import writer
+from fetch_pool import FetchPool
+from tournament import EspnSeason, EspnTournament, HtmlSource, LEADERBOARD_URL, season_id_from_url
+
+import pandas as pd
+
+INDEX_COLUMNS = ["tournament_id", "season_id", "t_url", "tournament_date", "tour"]
+
+
+class TournamentIndex():
+    """Persisted index of tournament id to season, url and date.
+
+    Built from season schedule pages once, then updated incrementally so
+    single tournaments can be fetched without crawling their season.
+    """
+
+    def __init__(self, f_path=path_config.TOURNAMENT_INDEX) -> None:
+        self.f_path = Path(f_path)
+        self.entries = {}
+
+        if self.f_path.exists():
+            df = pd.read_csv(self.f_path, dtype=str, keep_default_na=False)
+            for entry in df.to_dict("records"):
+                self.entries[entry["tournament_id"]] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, t_id):
+        return str(t_id) in self.entries
+
+    def get(self, t_id):
+        """Index entry of a tournament id, None if not indexed.
+
+        Examples
+        --------
+        >>> t_index = TournamentIndex()
+        >>> t_index.get("3802")
+        {"tournament_id": "3802", "season_id": "2018", ...}
+        """
+        return self.entries.get(str(t_id))
+
+    def indexed_seasons(self, tour="pga"):
+        return {entry["season_id"] for entry in self.entries.values() if entry["tour"] == tour}
+
+    def add_schedule(self, schedule, s_id, tour="pga"):
+        """Add the tournaments of a parsed season schedule.
+
+        Parameters
+        ----------
+        schedule : list of tuple
+            (tournament url, EspnTournament) from EspnSeason.retrieve_schedule.
+
+        s_id : str
+            Season identifier.
+
+        tour : str
+            Tour of the season.
+
+        Returns
+        -------
+        int
+            Number of tournaments not indexed before.
+        """
+        added = 0
+        for t_url, schedule_t in schedule:
+            t_id = schedule_t.get_tournament_id()
+            if t_id not in self.entries:
+                added += 1
+
+            self.entries[t_id] = {
+                "tournament_id": t_id,
+                "season_id": str(s_id),
+                "t_url": t_url,
+                "tournament_date": schedule_t.get_date() or "",
+                "tour": tour,
+            }
+
+        return added
+
+    def update(self, start, end=None, tour="pga", refresh_latest=True, max_workers=8, rate=None):
+        """Index the schedules of seasons not indexed yet.
+
+        Parameters
+        ----------
+        start : int
+            First season.
+
+        end : int, optional
+            Last season, inclusive.
+
+        tour : str
+            Tour to index.
+
+        refresh_latest : bool
+            Re-read the last season even if indexed, its schedule can still
+            change.
+
+        max_workers : int
+            Schedule pages fetched concurrently.
+
+        rate : float, optional
+            Requests per second.
+
+        Returns
+        -------
+        int
+            Number of tournaments added to the index.
+
+        Examples
+        --------
+        >>> t_index = TournamentIndex()
+        >>> t_index.update(2015, 2021)
+        >>> t_index.save()
+        """
+        indexed = self.indexed_seasons(tour)
+
+        with FetchPool(max_workers=max_workers, rate=rate) as f_pool:
+            e_season = EspnSeason(start, end, tour=tour, session=f_pool)
+
+            season_urls = [season_url for season_url in e_season.season_urls
+                           if season_id_from_url(season_url) not in indexed]
+            if refresh_latest and e_season.season_urls[-1] not in season_urls:
+                season_urls.append(e_season.season_urls[-1])
+
+            schedules = f_pool.map(e_season.retrieve_schedule, season_urls)
+
+        added = 0
+        for season_url, schedule in zip(season_urls, schedules):
+            added += self.add_schedule(schedule, season_id_from_url(season_url), tour)
+
+        return added
+
+    def save(self):
+        """Persist the index atomically."""
+        df = pd.DataFrame(list(self.entries.values()), columns=INDEX_COLUMNS)
+        df.sort_values(by=["tour", "season_id", "tournament_id"], inplace=True)
+
+        writer.atomic_write_csv(df, self.f_path)
+
+
+def fetch_tournaments(t_ids, t_index=None, source=None, max_workers=8, rate=None):
+    """Fetch tournaments by id straight from their leaderboards.
+
+    Ids are resolved through the tournament index, no schedule page is
+    crawled. Index entries of every tour are used, leaderboard urls do not
+    depend on the tour. Ids missing from the index are fetched from their
+    leaderboard url without a season id. Tournament overrides are applied.
+
+    Parameters
+    ----------
+    t_ids : list
+        Tournament identifiers.
+
+    t_index : TournamentIndex, optional
+        Index to resolve ids, the persisted index when not given.
+
+    source : object, optional
+        Data source, an HtmlSource on the fetch pool when not given.
+
+    max_workers : int
+        Leaderboards fetched concurrently.
+
+    rate : float, optional
+        Requests per second.
+
+    Returns
+    -------
+    list of EspnTournament
+        Tournaments in the order of t_ids. Tournaments that could not be
+        retrieved are empty.
+
+    Examples
+    --------
+    >>> espn_ts = fetch_tournaments(["3802", "401056542"])
+    >>> e_season = EspnSeason(2018)
+    >>> e_season.season_data = espn_ts
+    >>> df = e_season.feed_season_data()
+    """
+    if t_index is None:
+        t_index = TournamentIndex()
+
+    jobs = []
+    for t_id in t_ids:
+        entry = t_index.get(t_id)
+        if entry is None:
+            print(f"Tournament {t_id} not indexed, fetching without season")
+            jobs.append((t_id, f"{LEADERBOARD_URL}{t_id}", None))
+        else:
+            jobs.append((t_id, entry["t_url"], entry["season_id"]))
+
+    with FetchPool(max_workers=max_workers, rate=rate) as f_pool:
+        if source is None:
+            source = HtmlSource(session=f_pool)
+
+        def fetch(job):
+            t_id, t_url, s_id = job
+            try:
+                espn_t = source.fetch_tournament(t_url, s_id)
+            except Exception as e:
+                print(f"Error retrieving tournament {t_id}: {e}")
+                espn_t = None
+            return espn_t if espn_t is not None else EspnTournament()
+
+        espn_ts = f_pool.map(fetch, jobs)
+
+    validation.override_tournaments([espn_t.tournament_info for espn_t in espn_ts])
+
+    return espn_ts
@@ -0,0 +1,261 @@
+from pathlib import Path
+
+import path_config
+import writer
+
+import pandas as pd
+
+# Bounds for the range checks. 54 hole events finish around 200 strokes,
+# 90 hole events around 340.
+WIN_TOTAL_RANGE = (150, 400)
+TOURNAMENT_SIZE_RANGE = (1, 300)
+
+# Overrides field exempting a tournament from the rule named in value, for
+# events the bounds do not fit (Stableford scoring, rain shortened events).
+SKIP_RULE = "skip_rule"
+
+
+def has_winner(df):
+    return df["winner_name"].notna()
+
+
+def numeric(col):
+    """Float view of a column so missing values compare as NaN, not NA."""
+    return pd.to_numeric(col, errors="coerce").astype(float)
+
+
+def check_tournament_id(df):
+    return numeric(df["tournament_id"]).isna()
+
+
+def check_tournament_date(df):
+    return pd.to_datetime(df["tournament_date"], errors="coerce").isna()
+
+
+def check_date_in_season(df):
+    """Seasons can start in the fall of the previous calendar year."""
+    date_year = numeric(pd.to_datetime(df["tournament_date"], errors="coerce").dt.year)
+    season = numeric(df["season_id"].astype(str))
+
+    known = date_year.notna() & season.notna()
+
+    return known & ~date_year.between(season - 1, season)
+
+
+def check_tournament_purse(df):
+    return numeric(df["tournament_purse"]) < 0
+
+
+def check_win_total(df):
+    return has_winner(df) & ~numeric(df["win_total"]).between(*WIN_TOTAL_RANGE)
+
+
+def check_tournament_size(df):
+    return has_winner(df) & ~numeric(df["tournament_size"]).between(*TOURNAMENT_SIZE_RANGE)
+
+
+def check_winner_id(df):
+    return has_winner(df) & numeric(df["winner_id"].astype(str)).isna()
+
+
+# Each check returns a boolean series flagging failing rows, and names the
+# field it validates so rules on fields that were not retrieved (e.g.
+# win_total in a schedule only pull) can be skipped. Tournaments without a
+# winner (cancelled, not yet played) only need an id and date.
+RULES = [
+    ("invalid_tournament_id", check_tournament_id, "tournament_id"),
+    ("invalid_tournament_date", check_tournament_date, "tournament_date"),
+    ("date_outside_season", check_date_in_season, "tournament_date"),
+    ("negative_purse", check_tournament_purse, "tournament_purse"),
+    ("invalid_win_total", check_win_total, "win_total"),
+    ("invalid_tournament_size", check_tournament_size, "tournament_size"),
+    ("invalid_winner_id", check_winner_id, "winner_id"),
+]
+
+
+def load_overrides(f_path=path_config.TOURNAMENT_OVERRIDES):
+    """Load the overrides table.
+
+    Parameters
+    ----------
+    f_path : str or Path
+        Csv with tournament_id, field, value and reason columns. A
+        skip_rule field exempts the tournament from the rule named in value.
+
+    Returns
+    -------
+    pd.DataFrame
+        Overrides, empty if the file does not exist.
+
+    Examples
+    --------
+    >>> overrides = load_overrides()
+    """
+    if not Path(f_path).exists():
+        return pd.DataFrame(columns=["tournament_id", "field", "value", "reason"])
+
+    return pd.read_csv(f_path, dtype=str)
+
+
+def apply_overrides(df, overrides):
+    """Apply field overrides by tournament id.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Tournament data.
+
+    overrides : pd.DataFrame
+        Overrides table, see load_overrides.
+
+    Returns
+    -------
+    pd.DataFrame
+        Copy of df with the overrides applied.
+
+    Examples
+    --------
+    >>> df = apply_overrides(df, load_overrides())
+    """
+    df = df.copy()
+    t_ids = df["tournament_id"].astype(str)
+    overrides = overrides[overrides["field"] != SKIP_RULE]
+
+    for field, field_overrides in overrides.groupby("field"):
+        values = dict(zip(field_overrides["tournament_id"], field_overrides["value"]))
+        mask = t_ids.isin(values.keys())
+        if not mask.any():
+            continue
+
+        new_values = t_ids[mask].map(values)
+        col = df[field]
+
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            missing = set(new_values) - set(col.cat.categories)
+            df[field] = col.cat.add_categories(sorted(missing))
+        elif pd.api.types.is_numeric_dtype(col):
+            new_values = pd.to_numeric(new_values).astype(col.dtype)
+
+        df.loc[mask, field] = new_values
+
+    return df
+
+
+def override_tournaments(tournament_infos, overrides=None):
+    """Apply field overrides to tournament information in place.
+
+    Used wherever tournaments are consumed without going through
+    validate_tournaments, so raw outputs, aggregates and the query service
+    get the same corrections as the cleaned tournaments.
+
+    Parameters
+    ----------
+    tournament_infos : list of dict
+        Tournament fields as held by EspnTournament.tournament_info.
+
+    overrides : pd.DataFrame, optional
+        Overrides table. Loaded from path_config.TOURNAMENT_OVERRIDES when
+        not given.
+
+    Returns
+    -------
+    list of dict
+        tournament_infos, updated.
+
+    Examples
+    --------
+    >>> override_tournaments([espn_t.tournament_info for espn_t in e_season.season_data])
+    """
+    if overrides is None:
+        overrides = load_overrides()
+
+    overrides = overrides[overrides["field"] != SKIP_RULE]
+
+    values = {}
+    for t_id, field, value in zip(overrides["tournament_id"], overrides["field"], overrides["value"]):
+        values.setdefault(str(t_id), {})[field] = value
+
+    for tournament_info in tournament_infos:
+        tournament_info.update(values.get(str(tournament_info["tournament_id"]), {}))
+
+    return tournament_infos
+
+
+def validate_tournaments(df, overrides=None, fields=None):
+    """Apply overrides and split rows passing every rule from failing ones.
+
+    Rules a tournament is exempted from through a skip_rule override are
+    not held against it.
+
+    Every rule runs over whole columns at once, so the cost is a handful of
+    vectorized passes regardless of how many rows fail.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Tournament data from EspnSeason.feed_season_data.
+
+    overrides : pd.DataFrame, optional
+        Overrides table. Loaded from path_config.TOURNAMENT_OVERRIDES when
+        not given.
+
+    fields : list of str, optional
+        Tournament fields that were retrieved. Rules on other fields are
+        skipped. All rules run when not given.
+
+    Returns
+    -------
+    tuple of pd.DataFrame
+        (valid rows, quarantined rows). Quarantined rows carry a reasons
+        column naming the failed rules.
+
+    Examples
+    --------
+    >>> valid_df, quarantine_df = validate_tournaments(tourn_df)
+    >>> valid_df, quarantine_df = validate_tournaments(tourn_df, fields=SCHEDULE_FIELDS)
+    """
+    if overrides is None:
+        overrides = load_overrides()
+
+    df = apply_overrides(df, overrides)
+
+    rules = [(name, check) for name, check, field in RULES if fields is None or field in fields]
+
+    failures = pd.DataFrame({name: check(df) for name, check in rules}, index=df.index)
+    failures = failures.fillna(False).astype(bool)
+
+    t_ids = df["tournament_id"].astype(str)
+    skips = overrides[overrides["field"] == SKIP_RULE]
+    for name, rule_skips in skips.groupby("value"):
+        if name in failures.columns:
+            failures.loc[t_ids.isin(rule_skips["tournament_id"].astype(str)), name] = False
+
+    failed = failures.any(axis=1)
+
+    reasons = pd.Series("", index=df.index)
+    for name in failures.columns:
+        reasons = reasons.where(~failures[name], reasons + name + ";")
+
+    quarantine_df = df[failed].copy()
+    quarantine_df["reasons"] = reasons[failed].str.rstrip(";")
+
+    return df[~failed], quarantine_df
+
+
+def save_quarantine(quarantine_df, f_name):
+    """Save quarantined rows for review.
+
+    Parameters
+    ----------
+    quarantine_df : pd.DataFrame
+        Rows that failed validation.
+
+    f_name : str
+        File name within path_config.QUARANTINE_TOURNAMENTS.
+
+    Examples
+    --------
+    >>> save_quarantine(quarantine_df, "quarantine_tournaments_2018.csv")
+    """
+    file_path = Path(path_config.QUARANTINE_TOURNAMENTS, f_name)
+    writer.atomic_write_csv(quarantine_df, file_path)
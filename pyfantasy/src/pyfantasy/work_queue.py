@@ -0,0 +1,356 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import time
+from pathlib import Path
+
+import path_config
+from tournament import EspnSeason, EspnTournament, save_season_data, season_id_from_url
+
+
+class WorkQueue():
+    """Durable tournament job queue backed by SQLite.
+
+    Jobs are leased to a worker for lease_seconds. A job whose lease expires
+    without being completed is handed out again, up to max_attempts times,
+    after which it is marked failed. Only the current lease owner can
+    complete or release a job.
+    The default rollback journal is used (not WAL) so the queue file can be
+    shared by workers on hosts mounting the same volume.
+    """
+
+    def __init__(self, db_path=path_config.CRAWL_QUEUE, lease_seconds=300, max_attempts=3) -> None:
+        self.db_path = Path(db_path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                season_id TEXT NOT NULL,
+                t_url TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                result TEXT,
+                error TEXT
+            )
+        """)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def close(self):
+        self.conn.close()
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def put(self, season_id, t_url):
+        """Add a tournament job. Jobs already queued are left untouched.
+
+        Parameters
+        ----------
+        season_id : str
+            Season identifier of the tournament.
+
+        t_url : str
+            Tournament url to retrieve.
+
+        Examples
+        --------
+        >>> w_queue = WorkQueue()
+        >>> w_queue.put("2018", "https://www.espn.com/golf/leaderboard?tournamentId=3802")
+        """
+        self.conn.execute("INSERT OR IGNORE INTO jobs (season_id, t_url) VALUES (?, ?)", (str(season_id), t_url))
+
+    def claim(self, worker_id):
+        """Lease the next available job.
+
+        Parameters
+        ----------
+        worker_id : str
+            Identifier of the worker taking the lease.
+
+        Returns
+        -------
+        tuple or None
+            (job_id, season_id, t_url) or None if no job is available.
+
+        Examples
+        --------
+        >>> w_queue.claim("host-1234")
+        (1, "2018", "https://www.espn.com/golf/leaderboard?tournamentId=3802")
+        """
+        now = time.time()
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # workers that died on the last attempt leave their lease behind
+            self.conn.execute("""
+                UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired'), lease_expires = NULL
+                WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+            """, (now, self.max_attempts))
+
+            row = self.conn.execute("""
+                SELECT job_id, season_id, t_url FROM jobs
+                WHERE attempts < ?
+                AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))
+                ORDER BY job_id LIMIT 1
+            """, (self.max_attempts, now)).fetchone()
+
+            if row is not None:
+                self.conn.execute("""
+                    UPDATE jobs SET status = 'leased', attempts = attempts + 1,
+                    lease_owner = ?, lease_expires = ? WHERE job_id = ?
+                """, (worker_id, now + self.lease_seconds, row[0]))
+
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return row
+
+    def complete(self, job_id, worker_id, tournament_info):
+        """Store the result of a leased job.
+
+        Returns
+        -------
+        bool
+            False if worker_id no longer holds the lease, the result is then
+            discarded.
+        """
+        cursor = self.conn.execute("""
+            UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_expires = NULL
+            WHERE job_id = ? AND status = 'leased' AND lease_owner = ?
+        """, (json.dumps(tournament_info), job_id, worker_id))
+
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """Release a job after an error, marking it failed once out of attempts.
+
+        Returns
+        -------
+        bool
+            False if worker_id no longer holds the lease.
+        """
+        cursor = self.conn.execute("""
+            UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+            error = ?, lease_expires = NULL
+            WHERE job_id = ? AND status = 'leased' AND lease_owner = ?
+        """, (self.max_attempts, str(error), job_id, worker_id))
+
+        return cursor.rowcount == 1
+
+    def counts(self):
+        """Number of jobs per status.
+
+        Returns
+        -------
+        dict
+            Job counts keyed by status.
+        """
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def results(self):
+        """Tournament information of completed jobs in queue order.
+
+        Returns
+        -------
+        list of dict
+            tournament_info of every completed job.
+        """
+        rows = self.conn.execute("SELECT result FROM jobs WHERE status = 'done' ORDER BY job_id").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+def coordinator(start, end=None, db_path=path_config.CRAWL_QUEUE, tour="pga"):
+    """Expand seasons into tournament jobs on the queue.
+
+    Parameters
+    ----------
+    start : int
+        First season.
+
+    end : int, optional
+        Last season, inclusive.
+
+    db_path : str or Path
+        Queue file shared with the workers.
+
+    tour : str
+        Tour of the seasons, stored on the queue for workers and merge.
+
+    Returns
+    -------
+    dict
+        Job counts keyed by status.
+
+    Examples
+    --------
+    >>> coordinator(2015, 2021)
+    >>> coordinator(2018, tour="lpga")
+    """
+    e_season = EspnSeason(start, end, tour=tour)
+
+    w_queue = WorkQueue(db_path)
+    w_queue.set_meta("start", start)
+    w_queue.set_meta("end", end)
+    w_queue.set_meta("tour", tour)
+
+    for season_url in e_season.season_urls:
+        season_id = season_id_from_url(season_url)
+
+        for t_url in e_season.season_tournament_urls(season_url):
+            w_queue.put(season_id, t_url)
+
+    counts = w_queue.counts()
+    w_queue.close()
+
+    return counts
+
+
+def worker(db_path=path_config.CRAWL_QUEUE, worker_id=None, lease_seconds=300, max_jobs=None):
+    """Retrieve queued tournaments until the queue is drained.
+
+    Any number of workers can run against the same queue file.
+
+    Parameters
+    ----------
+    db_path : str or Path
+        Queue file shared with the coordinator.
+
+    worker_id : str, optional
+        Identifier recorded on leases. Defaults to host and process id.
+
+    lease_seconds : int
+        Seconds a job stays leased before another worker may take it.
+
+    max_jobs : int, optional
+        Stop after this many jobs.
+
+    Returns
+    -------
+    int
+        Number of jobs completed.
+
+    Examples
+    --------
+    >>> worker()
+    """
+    if worker_id is None:
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+    w_queue = WorkQueue(db_path, lease_seconds=lease_seconds)
+    e_season = EspnSeason(w_queue.get_meta("start"), tour=w_queue.get_meta("tour", "pga"))
+
+    completed = 0
+    while max_jobs is None or completed < max_jobs:
+
+        job = w_queue.claim(worker_id)
+        if job is None:
+            break
+
+        job_id, season_id, t_url = job
+        print(f"Fetching {t_url} data")
+
+        try:
+            espn_t = e_season.retrieve_tournament_info(t_url, season_id)
+            if not espn_t.get_tournament_id():
+                raise ValueError(f"No tournament data retrieved from {t_url}")
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            w_queue.fail(job_id, worker_id, e)
+        else:
+            if w_queue.complete(job_id, worker_id, espn_t.tournament_info):
+                completed += 1
+            else:
+                print(f"Job {job_id} lease lost, result discarded")
+        finally:
+            e_season.season_data.clear()
+
+    w_queue.close()
+
+    return completed
+
+
+def merge(db_path=path_config.CRAWL_QUEUE, optimize_dtypes=False):
+    """Produce the raw and cleaned outputs from completed jobs.
+
+    Parameters
+    ----------
+    db_path : str or Path
+        Queue file the workers completed.
+
+    optimize_dtypes : bool
+        Use the optimized schema (categoricals, nullable integers).
+
+    Returns
+    -------
+    CleanTournaments
+        Cleaned tournaments that were saved.
+
+    Examples
+    --------
+    >>> merge()
+    """
+    w_queue = WorkQueue(db_path)
+
+    counts = w_queue.counts()
+    unfinished = {status: n for status, n in counts.items() if status != "done"}
+    if unfinished:
+        print(f"Merging with unfinished jobs: {unfinished}")
+
+    e_season = EspnSeason(w_queue.get_meta("start"), w_queue.get_meta("end"), tour=w_queue.get_meta("tour", "pga"))
+    for tournament_info in w_queue.results():
+        espn_t = EspnTournament()
+        espn_t.tournament_info.update(tournament_info)
+        e_season.season_data.append(espn_t)
+
+    w_queue.close()
+
+    return save_season_data(e_season, optimize_dtypes=optimize_dtypes)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Sharded ESPN tournament crawl")
+    parser.add_argument("--queue", default=path_config.CRAWL_QUEUE, help="queue file shared by all processes")
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    coordinator_parser = subparsers.add_parser("coordinator")
+    coordinator_parser.add_argument("start", type=int)
+    coordinator_parser.add_argument("end", type=int, nargs="?")
+    coordinator_parser.add_argument("--tour", default="pga")
+
+    worker_parser = subparsers.add_parser("worker")
+    worker_parser.add_argument("--lease-seconds", type=int, default=300)
+
+    merge_parser = subparsers.add_parser("merge")
+    merge_parser.add_argument("--optimize-dtypes", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "coordinator":
+        print(coordinator(args.start, args.end, db_path=args.queue, tour=args.tour))
+    elif args.command == "worker":
+        print(f"Completed {worker(args.queue, lease_seconds=args.lease_seconds)} jobs")
+    else:
+        merge(args.queue, optimize_dtypes=args.optimize_dtypes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+SCHEMA_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def atomic_write(file_path, write):
+    """Write a file through a temp file renamed into place.
+
+    A crash mid-write leaves the previous file untouched, never a
+    truncated one.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        Final file path.
+
+    write : callable
+        Called with the temp file path to write the content.
+
+    Examples
+    --------
+    >>> atomic_write("espn_tournaments_2018.csv", lambda tmp: df.to_csv(tmp, index=False))
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{file_path.name}.", suffix=".tmp", dir=file_path.parent)
+    os.close(fd)
+
+    try:
+        write(tmp_name)
+        with open(tmp_name, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
+def atomic_write_csv(df, file_path):
+    """Write a dataframe to csv atomically.
+
+    Examples
+    --------
+    >>> atomic_write_csv(df, Path(path_config.RAW_TOURNAMENTS, "espn_tournaments_2018.csv"))
+    """
+    atomic_write(file_path, lambda tmp_name: df.to_csv(tmp_name, index=False))
+
+
+def file_checksum(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+
+    return sha.hexdigest()
+
+
+def read_manifest(dataset_dir):
+    """Read a dataset manifest.
+
+    Parameters
+    ----------
+    dataset_dir : str or Path
+        Directory holding the shards and manifest.
+
+    Returns
+    -------
+    dict or None
+        Manifest, None if the dataset has not been written.
+    """
+    manifest_path = Path(dataset_dir, MANIFEST)
+    if not manifest_path.exists():
+        return None
+
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def write_shard(dataset_dir, partition, value, shard_df):
+    f_name = f"{partition}={value}.csv"
+    file_path = Path(dataset_dir, f_name)
+
+    atomic_write_csv(shard_df, file_path)
+
+    return {
+        "partition": str(value),
+        "file": f_name,
+        "rows": len(shard_df),
+        "sha256": file_checksum(file_path),
+    }
+
+
+def write_shards(df, dataset_dir, partition="season_id", max_workers=4):
+    """Write a dataframe as per partition csv shards with a manifest.
+
+    Shards are written in parallel, each through a temp file renamed into
+    place. The manifest is written last, so readers only ever see complete
+    shards. Shards of partitions not present in df are kept.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Tournament data to write.
+
+    dataset_dir : str or Path
+        Directory holding the shards and manifest.
+
+    partition : str
+        Column to shard on.
+
+    max_workers : int
+        Shards written concurrently.
+
+    Returns
+    -------
+    dict
+        Manifest written.
+
+    Examples
+    --------
+    >>> write_shards(df, Path(path_config.RAW_TOURNAMENTS, "espn_tournaments_2015_2021"))
+    """
+    dataset_dir = Path(dataset_dir)
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+
+    groups = df.groupby(df[partition].astype(str), observed=True, sort=True)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(write_shard, dataset_dir, partition, value, shard_df)
+                   for value, shard_df in groups]
+        shards = [future.result() for future in futures]
+
+    manifest = read_manifest(dataset_dir)
+    if manifest is not None and manifest["partition"] == partition:
+        written = {shard["partition"] for shard in shards}
+        shards += [shard for shard in manifest["shards"] if shard["partition"] not in written]
+
+    manifest = {
+        "schema_version": SCHEMA_VERSION,
+        "partition": partition,
+        "columns": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "shards": sorted(shards, key=lambda shard: shard["partition"]),
+    }
+
+    def write_manifest(tmp_name):
+        with open(tmp_name, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    atomic_write(Path(dataset_dir, MANIFEST), write_manifest)
+
+    return manifest
+
+
+def read_shards(dataset_dir, partitions=None, verify=False):
+    """Read shards listed in a dataset manifest.
+
+    Parameters
+    ----------
+    dataset_dir : str or Path
+        Directory holding the shards and manifest.
+
+    partitions : list, optional
+        Partition values to load, e.g. seasons. All shards when not given.
+
+    verify : bool
+        Check shard checksums against the manifest.
+
+    Returns
+    -------
+    pd.DataFrame
+        Rows of the selected shards with the dtypes recorded in the manifest.
+
+    Examples
+    --------
+    >>> df = read_shards(dataset_dir, partitions=[2020, 2021])
+    """
+    manifest = read_manifest(dataset_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No {MANIFEST} in {dataset_dir}")
+
+    if manifest["schema_version"] != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported schema version {manifest['schema_version']} in {dataset_dir}")
+
+    shards = manifest["shards"]
+    if partitions is not None:
+        wanted = {str(value) for value in partitions}
+        shards = [shard for shard in shards if shard["partition"] in wanted]
+
+    dtypes = {}
+    parse_dates = []
+    for col, dtype in manifest["columns"].items():
+        if dtype.startswith("datetime64"):
+            parse_dates.append(col)
+        elif dtype in ("object", "str", "string"):
+            dtypes[col] = str
+        else:
+            dtypes[col] = dtype
+
+    frames = []
+    for shard in shards:
+        file_path = Path(dataset_dir, shard["file"])
+
+        if verify and file_checksum(file_path) != shard["sha256"]:
+            raise ValueError(f"Checksum mismatch for shard {file_path}")
+
+        frames.append(pd.read_csv(file_path, dtype=dtypes, parse_dates=parse_dates))
+
+    if not frames:
+        return pd.DataFrame(columns=list(manifest["columns"]))
+
+    df = pd.concat(frames, ignore_index=True)
+
+    # concat of categoricals with different categories falls back to object
+    for col, dtype in manifest["columns"].items():
+        if dtype == "category":
+            df[col] = df[col].astype("category")
+
+    return df
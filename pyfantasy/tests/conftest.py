@@ -0,0 +1,52 @@
+from pyfantasy import tournament_index
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from helpers import FakePage
+
+TEST_DATA = Path(Path(__file__).parent, "data")
+
+
+@pytest.fixture
+def schedule_content():
+    return Path(TEST_DATA, "espn_schedule_2018.html").read_bytes()
+
+
+@pytest.fixture
+def schedule_pages(monkeypatch, schedule_content):
+    """Serve the 2018 schedule page for every FetchPool request."""
+    urls = []
+
+    def get(self, url):
+        urls.append(url)
+        return FakePage(schedule_content)
+
+    monkeypatch.setattr(tournament_index.FetchPool, "get", get)
+
+    return urls
+
+
+@pytest.fixture
+def tournaments_df():
+    """Raw tournaments as fed by EspnSeason, with a cancelled event."""
+    data = [
+        {"tournament_id": "3802", "tournament_name": "THE CJ CUP @ NINE BRIDGES", "tournament_date": "10/19/2017",
+         "tournament_purse": "9250000", "win_total": "279", "tournament_size": 78,
+         "winner_name": "Justin Thomas", "winner_id": "4848", "season_id": "2018"},
+        {"tournament_id": "3803", "tournament_name": "Sentry Tournament of Champions", "tournament_date": "1/4/2018",
+         "tournament_purse": "6300000", "win_total": "268", "tournament_size": 34,
+         "winner_name": "Dustin Johnson", "winner_id": "3448", "season_id": "2018"},
+        {"tournament_id": "3757", "tournament_name": "The Honda Classic", "tournament_date": "2/22/2018",
+         "tournament_purse": "6600000", "win_total": "272", "tournament_size": 144,
+         "winner_name": "Justin Thomas", "winner_id": "4848", "season_id": "2018"},
+        {"tournament_id": "401056542", "tournament_name": "TOUR Championship", "tournament_date": "8/22/2019",
+         "tournament_purse": "46000000", "win_total": "266", "tournament_size": 30,
+         "winner_name": "Rory McIlroy", "winner_id": "3470", "season_id": "2019"},
+        {"tournament_id": "401155418", "tournament_name": "Cancelled Open", "tournament_date": "3/19/2020",
+         "tournament_purse": "7000000", "win_total": None, "tournament_size": None,
+         "winner_name": None, "winner_id": None, "season_id": "2020"},
+    ]
+    return pd.DataFrame(data)
@@ -0,0 +1,44 @@
+from pyfantasy.tournament import EspnTournament
+
+import threading
+
+
+class FakePage():
+
+    def __init__(self, content) -> None:
+        self.status_code = 200
+        self.content = content
+
+
+class RecordingSource():
+    """Data source recording the fetches it is asked for.
+
+    Tournaments whose id is in t_ids are returned with their id and season
+    set, ids in error_ids raise and every other fetch fails like a missing
+    leaderboard.
+    """
+
+    def __init__(self, session=None, t_ids=(), error_ids=()) -> None:
+        self.session = session
+        self.t_ids = set(t_ids)
+        self.error_ids = set(error_ids)
+        self.jobs = []
+        self.lock = threading.Lock()
+
+    @property
+    def t_urls(self):
+        return [t_url for t_url, _ in self.jobs]
+
+    def fetch_tournament(self, t_url, s_id):
+        with self.lock:
+            self.jobs.append((t_url, s_id))
+
+        espn_t = EspnTournament()
+        espn_t.set_tournament_id(t_url)
+        if espn_t.get_tournament_id() in self.error_ids:
+            raise ConnectionError(f"connection reset fetching {t_url}")
+        if espn_t.get_tournament_id() not in self.t_ids:
+            return None
+
+        espn_t.set_season_id(s_id)
+        return espn_t
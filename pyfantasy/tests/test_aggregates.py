@@ -0,0 +1,91 @@
+from pyfantasy.aggregates import TournamentAggregates
+from pyfantasy.tournament import EspnSeason, EspnTournament
+
+import pandas as pd
+import pytest
+
+
+def test_winner_aggregates(tournaments_df):
+
+    # a winner without a recorded total
+    df = tournaments_df.copy()
+    df.loc[df["winner_id"] == "3470", "win_total"] = None
+
+    t_agg = TournamentAggregates()
+    added = t_agg.update(df)
+
+    winners = t_agg.winner_frame()
+
+    assert added == 4
+    assert winners.loc["4848", "wins"] == 2
+    assert winners.loc["4848", "avg_win_total"] == (279 + 272) / 2
+    assert winners.loc["4848", "purse_weighted_wins"] == pytest.approx(15850000 / (68150000 / 4))
+    assert pd.isna(winners.loc["3470", "avg_win_total"])
+    assert t_agg.player_season_wins("4848") == {"2018": 2}
+
+
+def test_update_only_applies_new_rows(tournaments_df):
+
+    t_agg = TournamentAggregates()
+    t_agg.update(tournaments_df.iloc[:2])
+
+    added = t_agg.update(tournaments_df)
+    seasons = t_agg.season_frame()
+
+    assert added == 2
+    assert seasons.loc["2018", "tournaments"] == 3
+    assert seasons.loc["2018", "distinct_winners"] == 2
+    assert seasons.loc["2019", "distinct_winners"] == 1
+
+
+def test_update_replaces_changed_winner():
+
+    leader = {"tournament_id": "401", "tournament_purse": "1000", "win_total": "140",
+              "winner_name": "Leader", "winner_id": "1", "season_id": "2018"}
+    final = dict(leader, win_total="270", winner_name="Final Winner", winner_id="2")
+
+    t_agg = TournamentAggregates()
+    assert t_agg.add_tournament(leader)
+    assert t_agg.add_tournament(final)
+    assert not t_agg.add_tournament(final)
+
+    winners = t_agg.winner_frame()
+    seasons = t_agg.season_frame()
+
+    assert list(winners.index) == ["2"]
+    assert winners.loc["2", "avg_win_total"] == 270
+    assert seasons.loc["2018", "tournaments"] == 1
+    assert seasons.loc["2018", "distinct_winners"] == 1
+    assert t_agg.total_purse == 1000
+
+
+def test_update_from_season_applies_overrides():
+
+    espn_t = EspnTournament()
+    espn_t.tournament_info.update({"tournament_id": "2277", "tournament_purse": "1000000", "season_id": "2016"})
+    espn_t.set_all_w("Wrong Winner", "1", None)
+
+    e_season = EspnSeason(2016)
+    e_season.season_data.append(espn_t)
+
+    t_agg = TournamentAggregates()
+    t_agg.update_from_season(e_season)
+
+    winners = t_agg.winner_frame()
+
+    assert list(winners.index) == ["1037"]
+    assert winners.loc["1037", "avg_win_total"] == 265
+
+
+def test_save_and_load(tournaments_df, tmp_path):
+
+    f_path = tmp_path / "aggregates.json"
+
+    t_agg = TournamentAggregates()
+    t_agg.update(tournaments_df)
+    t_agg.save(f_path)
+
+    loaded = TournamentAggregates.load(f_path)
+
+    assert loaded.update(tournaments_df) == 0
+    pd.testing.assert_frame_equal(loaded.winner_frame(), t_agg.winner_frame())
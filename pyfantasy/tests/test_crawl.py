@@ -0,0 +1,150 @@
+from pyfantasy import tournament
+from pyfantasy.crawl import CrawlPlan
+from pyfantasy.fetch_pool import FetchJob, FetchPool, RateLimiter
+from pyfantasy.tournament import EspnSeason, EspnTournament, SCHEDULE_FIELDS, schedule_url
+
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from helpers import FakePage, RecordingSource
+
+
+def test_schedule_url():
+
+    assert schedule_url(2018) == "https://www.espn.com/golf/schedule/_/season/2018"
+    assert schedule_url(2018, "dpworld") == "https://www.espn.com/golf/schedule/_/season/2018/tour/eur"
+
+
+def test_output_name_partitioned_by_tour():
+
+    assert EspnSeason(2015, 2021).output_name("valid_tournaments") == "valid_tournaments_2015_2021.csv"
+    assert EspnSeason(2018, tour="lpga").output_name("valid_tournaments") == "valid_tournaments_lpga_2018.csv"
+
+    with pytest.raises(ValueError):
+        EspnSeason(2018, tour="korn-ferry")
+
+
+def test_rate_limiter():
+
+    limiter = RateLimiter(rate=20, burst=1)
+
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+
+    assert time.monotonic() - start >= 0.15
+
+
+def test_crawl_plan_shares_pool(schedule_content):
+
+    c_plan = CrawlPlan(2018, tours=["pga", "lpga"], max_workers=4, source_cls=RecordingSource)
+
+    urls = []
+    lock = threading.Lock()
+
+    def get(url):
+        with lock:
+            urls.append(url)
+        return FakePage(schedule_content)
+
+    c_plan.pool.get = get
+
+    try:
+        c_plan.run(fields=SCHEDULE_FIELDS)
+    finally:
+        c_plan.close()
+
+    assert sorted(urls) == [schedule_url(2018), schedule_url(2018, "lpga")]
+    assert len(c_plan.seasons["pga"].season_data) == 3
+    assert len(c_plan.seasons["lpga"].season_data) == 3
+    assert c_plan.seasons["lpga"].source.session is c_plan.pool
+    assert c_plan.seasons["lpga"].source.t_urls == []
+
+
+def test_run_jobs_priority_and_deadline():
+
+    order = []
+    jobs = [FetchJob(order.append, (name,), priority) for name, priority in [("old", 3), ("live", 0), ("recent", 1)]]
+    jobs.append(FetchJob(order.append, ("late",), 2, deadline=time.monotonic() - 1))
+
+    with FetchPool(max_workers=1) as f_pool:
+        f_pool.run_jobs(jobs)
+
+    assert order == ["live", "recent", "old"]
+    assert jobs[-1].skipped
+
+
+def test_tournament_priority():
+
+    e_season = EspnSeason(2018)
+    today = date(2018, 1, 6)
+
+    def scheduled(t_date):
+        espn_t = EspnTournament()
+        espn_t.tournament_info["tournament_date"] = t_date
+        return espn_t
+
+    ranked = sorted(["10/19/2017", "1/4/2018", "1/25/2018", "12/28/2017", ""],
+                    key=lambda t_date: e_season.tournament_priority(scheduled(t_date), today))
+
+    assert ranked == ["1/4/2018", "12/28/2017", "10/19/2017", "1/25/2018", ""]
+
+
+def test_retrieve_all_seasons_fetches_recent_first(monkeypatch, schedule_content):
+
+    source = RecordingSource()
+    e_season = EspnSeason(2018, source=source)
+    monkeypatch.setattr(e_season, "retrieve_schedule",
+                        lambda season_url: e_season.parse_schedule(schedule_content, "2018"))
+
+    skipped = e_season.retrieve_all_seasons(today=date(2018, 1, 6))
+
+    assert skipped == []
+    assert [t_url[-4:] for t_url in source.t_urls] == ["3742", "3803", "3802"]
+    assert [espn_t["tournament_id"] for espn_t in e_season.season_data] == ["3802", "3803", "3742"]
+
+
+def test_retrieve_all_seasons_deadline(monkeypatch, schedule_content):
+
+    e_season = EspnSeason(2018, source=RecordingSource())
+    monkeypatch.setattr(e_season, "retrieve_schedule",
+                        lambda season_url: e_season.parse_schedule(schedule_content, "2018"))
+
+    skipped = e_season.retrieve_all_seasons(deadline=0)
+
+    assert skipped == [schedule_url(2018)]
+    assert e_season.season_data == []
+
+    def slow_schedule(season_url):
+        time.sleep(0.2)
+        return e_season.parse_schedule(schedule_content, "2018")
+
+    # the deadline passes while the schedule page is fetched
+    monkeypatch.setattr(e_season, "retrieve_schedule", slow_schedule)
+
+    skipped = e_season.retrieve_all_seasons(deadline=0.1)
+
+    assert len(skipped) == 3
+    assert e_season.source.t_urls == []
+    # skipped leaderboards keep their schedule rows
+    assert [espn_t["tournament_id"] for espn_t in e_season.season_data] == ["3802", "3803", "3742"]
+    assert e_season.season_data[0]["tournament_name"] != ""
+
+
+def test_plain_session_requests_time_out(monkeypatch):
+
+    timeouts = []
+
+    def get(self, url, timeout=None):
+        timeouts.append(timeout)
+        return FakePage(b"")
+
+    monkeypatch.setattr(tournament.requests.Session, "get", get)
+
+    EspnSeason(2018).get(schedule_url(2018))
+    tournament.HtmlSource().get(schedule_url(2018))
+
+    assert timeouts == [tournament.REQUEST_TIMEOUT] * 2
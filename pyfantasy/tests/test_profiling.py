@@ -0,0 +1,95 @@
+from pyfantasy import profiling
+from pyfantasy.profiling import NULL_PROFILER, StageProfiler
+from pyfantasy.tournament import EspnSeason
+
+import time
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    data = []
+    while time.perf_counter() < end:
+        data.append(str(len(data)))
+    return data
+
+
+def test_null_profiler_stage_is_shared():
+
+    assert NULL_PROFILER.stage("soup") is NULL_PROFILER.stage("extract")
+
+    with NULL_PROFILER.stage("soup"):
+        pass
+
+
+def test_stage_profiler_nested_stages(tmp_path):
+
+    profiler = StageProfiler(interval=0.001)
+    profiler.start()
+    try:
+        with profiler.stage("frame"):
+            busy(0.02)
+            with profiler.stage("write"):
+                busy(0.05)
+    finally:
+        profiler.stop()
+
+    assert profiler.calls == {"frame": 1, "write": 1}
+    assert profiler.wall["frame"] >= profiler.wall["write"]
+    assert profiler.peaks["write"] > 0
+    assert any("test_profiling.py" in site for site in profiler.allocation_sites("write"))
+    assert any(stack.startswith("write;") for stack in profiler.samples)
+
+    report_path, stacks_path = profiler.write_report(tmp_path, "espn_tournaments_2018")
+
+    report = report_path.read_text()
+    assert "== stage write ==" in report
+    assert "busy" in report
+
+    line = stacks_path.read_text().splitlines()[0]
+    stack, count = line.rsplit(" ", 1)
+    assert int(count) > 0
+    assert ";" in stack
+
+
+def test_snapshots_once_per_stage_name(monkeypatch):
+
+    take_snapshot = profiling.tracemalloc.take_snapshot
+    snapshots = []
+
+    def slow_snapshot():
+        snapshots.append(1)
+        time.sleep(0.05)
+        return take_snapshot()
+
+    monkeypatch.setattr(profiling.tracemalloc, "take_snapshot", slow_snapshot)
+
+    profiler = StageProfiler()
+    profiler.start()
+    try:
+        with profiler.stage("fetch"):
+            for _ in range(5):
+                with profiler.stage("soup"):
+                    pass
+    finally:
+        profiler.stop()
+
+    assert len(snapshots) == 4
+    # snapshot time is not charged to the stages
+    assert profiler.wall["soup"] < 0.05
+    assert profiler.wall["fetch"] < 0.05
+    assert profiler.run_peak > 0
+
+
+def test_season_profile_stages(schedule_content):
+
+    e_season = EspnSeason(2018, profile=True)
+    assert e_season.source.profiler is e_season.profiler
+
+    e_season.profiler.start()
+    try:
+        e_season.parse_schedule(schedule_content, "2018")
+    finally:
+        e_season.profiler.stop()
+
+    assert set(e_season.profiler.calls) == {"soup", "schedule"}
+    assert not EspnSeason(2018).profiler.enabled
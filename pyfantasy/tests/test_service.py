@@ -0,0 +1,145 @@
+from pyfantasy.service import EspnSeason, SingleFlight, TournamentCache, TournamentService
+from pyfantasy.tournament import EspnTournament
+from pyfantasy.tournament_index import TournamentIndex
+
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from urllib.request import urlopen
+
+import pytest
+
+
+class CountingSource():
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def fetch_tournament(self, t_url, s_id):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.05)
+
+        espn_t = EspnTournament()
+        espn_t.set_tournament_id(t_url)
+        espn_t.set_all_w("Justin Thomas", "4848", "279")
+        espn_t.tournament_info["tournament_date"] = "10/19/2017"
+        espn_t.set_season_id(s_id)
+        return espn_t
+
+
+def test_single_flight_coalesces_calls():
+
+    flight = SingleFlight()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return "3802"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("3802", slow_fetch))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["3802"] * 8
+
+
+def test_cache_refreshes_stale_entries():
+
+    t_cache = TournamentCache(ttl=0)
+    values = iter([1, 2])
+
+    assert t_cache.get(("tournament", "1"), lambda: next(values)) == 1
+    assert t_cache.refresh_stale() == 1
+    assert t_cache.get(("tournament", "1"), lambda: 3) == 2
+
+
+def test_cache_stores_value_inside_flight():
+
+    t_cache = TournamentCache()
+    stored = []
+
+    class CheckedFlight(SingleFlight):
+
+        def do(self, key, fn):
+            value = super().do(key, fn)
+            # callers arriving once the flight ends must hit the cache
+            stored.append(key in t_cache.entries)
+            return value
+
+    t_cache.flight = CheckedFlight()
+
+    assert t_cache.get(("tournament", "3802"), lambda: "3802") == "3802"
+    assert stored == [True]
+
+
+def test_service_resolves_season_of_cold_tournament(schedule_pages, tmp_path):
+
+    t_service = TournamentService(source=CountingSource(), t_index=TournamentIndex(tmp_path / "index.csv"))
+
+    assert t_service.tournament("3802")["season_id"] == "2018"
+    assert (tmp_path / "index.csv").exists()
+
+    # the index now resolves the season before fetching
+    assert t_service.tournament("3742")["season_id"] == "2018"
+    assert len(schedule_pages) == 2
+
+
+def test_service_coalesces_tournament_fetches(schedule_pages, tmp_path):
+
+    source = CountingSource()
+    t_service = TournamentService(source=source, t_index=TournamentIndex(tmp_path / "index.csv"))
+
+    threads = [threading.Thread(target=t_service.tournament, args=("3802",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert source.calls == 1
+    assert t_service.winner("4848")[0]["tournament_id"] == "3802"
+
+
+def test_service_season_on_tour(monkeypatch, schedule_content, tmp_path):
+
+    season_urls = []
+
+    def retrieve_schedule(self, season_url):
+        season_urls.append(season_url)
+        return self.parse_schedule(schedule_content, "2018")
+
+    monkeypatch.setattr(EspnSeason, "retrieve_schedule", retrieve_schedule)
+
+    t_service = TournamentService(source=CountingSource(), t_index=TournamentIndex(tmp_path / "index.csv"),
+                                  tour="lpga")
+
+    assert len(t_service.season("2018")) == 3
+    assert season_urls == ["https://www.espn.com/golf/schedule/_/season/2018/tour/lpga"]
+
+
+@pytest.fixture
+def service_url(schedule_pages, tmp_path):
+    t_service = TournamentService(source=CountingSource(), t_index=TournamentIndex(tmp_path / "index.csv"))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), t_service.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}"
+
+    server.shutdown()
+
+
+def test_http_tournament_query(service_url):
+
+    with urlopen(f"{service_url}/tournaments/3802") as response:
+        body = json.load(response)
+
+    assert body["winner_name"] == "Justin Thomas"
@@ -0,0 +1,36 @@
+from pyfantasy import shared_data
+from pyfantasy.tournament import optimize_tournament_dtypes
+
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def optimized_df(tournaments_df):
+    return optimize_tournament_dtypes(pd.concat([tournaments_df] * 200, ignore_index=True))
+
+
+def test_export_and_load_arrow(optimized_df, tmp_path):
+
+    f_path = tmp_path / "valid_tournaments_2018.arrow"
+    shared_data.export_arrow(optimized_df, f_path)
+
+    table = shared_data.load_arrow(f_path)
+
+    assert table.num_rows == 1000
+    assert pa.types.is_dictionary(table.column("winner_name").type)
+
+
+def test_load_shared_frame_is_zero_copy(optimized_df, tmp_path):
+
+    f_path = tmp_path / "valid_tournaments_2018.arrow"
+    shared_data.export_arrow(optimized_df, f_path)
+
+    allocated = pa.total_allocated_bytes()
+    df = shared_data.load_shared_frame(f_path)
+
+    assert pa.total_allocated_bytes() - allocated < 1024
+    assert df["tournament_purse"].sum() == optimized_df["tournament_purse"].sum()
+    assert list(df["winner_name"][:2]) == ["Justin Thomas", "Dustin Johnson"]
@@ -0,0 +1,57 @@
+from pyfantasy.tournament_index import TournamentIndex, fetch_tournaments
+
+from helpers import RecordingSource
+
+
+def test_update_is_incremental(schedule_pages, tmp_path):
+
+    t_index = TournamentIndex(tmp_path / "index.csv")
+
+    assert t_index.update(2018) == 3
+    assert t_index.get("3802")["tournament_date"] == "10/19/2017"
+
+    t_index.update(2018, refresh_latest=False)
+    assert len(schedule_pages) == 1
+
+
+def test_save_and_load(schedule_pages, tmp_path):
+
+    t_index = TournamentIndex(tmp_path / "index.csv")
+    t_index.update(2018)
+    t_index.save()
+
+    loaded = TournamentIndex(tmp_path / "index.csv")
+
+    assert len(loaded) == 3
+    assert loaded.get("3742") == t_index.get("3742")
+
+
+def test_fetch_tournaments(schedule_pages, tmp_path):
+
+    t_index = TournamentIndex(tmp_path / "index.csv")
+    t_index.update(2018)
+
+    source = RecordingSource(t_ids=["3802", "9999"])
+    espn_ts = fetch_tournaments(["3802", "3803", "9999"], t_index=t_index, source=source)
+
+    assert [espn_t["tournament_id"] for espn_t in espn_ts] == ["3802", "", "9999"]
+    assert sorted(source.jobs) == [
+        ("https://www.espn.com/golf/leaderboard?tournamentId=3802", "2018"),
+        ("https://www.espn.com/golf/leaderboard?tournamentId=3803", "2018"),
+        ("https://www.espn.com/golf/leaderboard?tournamentId=9999", None),
+    ]
+    # only the schedule page used to build the index was requested
+    assert len(schedule_pages) == 1
+
+
+def test_fetch_tournaments_error(schedule_pages, tmp_path, capsys):
+
+    t_index = TournamentIndex(tmp_path / "index.csv")
+    t_index.update(2018)
+
+    source = RecordingSource(t_ids=["3802", "3803"], error_ids=["3757"])
+    espn_ts = fetch_tournaments(["3802", "3757", "3803"], t_index=t_index, source=source)
+
+    # the failing id comes back empty without aborting the rest of the batch
+    assert [espn_t["tournament_id"] for espn_t in espn_ts] == ["3802", "", "3803"]
+    assert "Error retrieving tournament 3757" in capsys.readouterr().out
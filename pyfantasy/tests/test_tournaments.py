@@ -1,9 +1,21 @@
 
-from pyfantasy.tournament import EspnTournament
+from pyfantasy.tournament import EspnTournament, CleanTournaments, optimize_tournament_dtypes, memory_report
+from pyfantasy import tournament
+from pyfantasy.tournament import EspnSeason, JsonSource, SCHEDULE_FIELDS, save_season_data
+
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
 
 import requests
 from bs4 import BeautifulSoup
 import pytest
+import pandas as pd
+
+from helpers import RecordingSource
+
+TEST_DATA = Path(Path(__file__).parent, "data")
 
 
 def test_espn_tournament_id():
@@ -258,7 +270,195 @@ def test_espn_tournament_integration(retrieve_tournament_header, retrieve_tourna
     assert expected_season_id == actual_season_id
 
 
-    
+def test_optimize_tournament_dtypes(tournaments_df):
+
+    optimized_df = optimize_tournament_dtypes(tournaments_df)
+
+    assert optimized_df["tournament_name"].dtype == "category"
+    assert optimized_df["winner_id"].dtype == "category"
+    assert optimized_df["season_id"].dtype == "category"
+    assert optimized_df["tournament_id"].dtype == "Int64"
+    assert optimized_df["tournament_purse"].dtype == "Int64"
+    assert optimized_df["win_total"].dtype == "Int32"
+    assert optimized_df["tournament_size"].dtype == "Int32"
+    assert pd.api.types.is_datetime64_any_dtype(optimized_df["tournament_date"])
+    assert optimized_df["win_total"].isna().sum() == 1
+
+
+def test_memory_report(tournaments_df):
+
+    report = memory_report(tournaments_df)
+
+    assert list(report.columns) == ["before", "after", "saved"]
+    assert report.loc["total", "before"] == report["before"].drop("total").sum()
+    assert report.loc["total", "saved"] == report.loc["total", "before"] - report.loc["total", "after"]
+
+
+def test_clean_tournaments_keeps_schema(tournaments_df):
+
+    clean_tourn = CleanTournaments(optimize_tournament_dtypes(tournaments_df))
+    clean_tourn.keep_valid_tournaments()
+
+    actual = clean_tourn.cleaned_df
+
+    assert list(actual["tournament_id"]) == [3802, 3803, 3757]
+    assert actual["winner_name"].dtype == "category"
+    assert list(actual["winner_name"].cat.categories) == ["Dustin Johnson", "Justin Thomas"]
+
+
+@pytest.fixture
+def espn_api_stub():
+    """Local server serving recorded ESPN event json from tests/data."""
+
+    class EventHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            event = parse_qs(urlparse(self.path).query).get("event", [""])[0]
+            f_path = Path(TEST_DATA, f"espn_event_{event}.json")
+
+            if f_path.exists():
+                body = f_path.read_bytes()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+            else:
+                body = b"{}"
+                self.send_response(404)
+
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), EventHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}/leaderboard"
+
+    server.shutdown()
+
+
+def test_json_source(espn_api_stub):
+
+    json_source = JsonSource(api_url=espn_api_stub, fallback=RecordingSource())
+
+    espn_t = json_source.fetch_tournament("https://www.espn.com/golf/leaderboard?tournamentId=3802", 2018)
+
+    assert espn_t["tournament_id"] == "3802"
+    assert espn_t["tournament_name"] == "THE CJ CUP @ NINE BRIDGES"
+    assert espn_t["tournament_date"] == "10/19/2017"
+    assert espn_t["tournament_purse"] == "9250000"
+    assert espn_t["win_total"] == "279"
+    assert espn_t["tournament_size"] == 3
+    assert espn_t["winner_name"] == "Justin Thomas"
+    assert espn_t["winner_id"] == "4848"
+    assert espn_t["season_id"] == 2018
+
+
+def test_json_source_five_round_event(espn_api_stub):
+
+    json_source = JsonSource(api_url=espn_api_stub, fallback=RecordingSource())
+
+    espn_t = json_source.fetch_tournament("https://www.espn.com/golf/leaderboard?tournamentId=1083", 2011)
+
+    # five regulation rounds, the sixth period is the playoff
+    assert espn_t["win_total"] == "333"
+    assert espn_t["winner_name"] == "Jhonattan Vegas"
+    assert espn_t["tournament_size"] == 4
+
+
+def test_json_source_number_of_rounds():
+
+    json_source = JsonSource(fallback=RecordingSource())
+    winner = {"id": "1", "sortOrder": 1, "athlete": {"id": "1", "displayName": "Leader"},
+              "linescores": [{"period": period, "value": 70} for period in range(1, 6)]}
+    payload = {"events": [{"date": "2011-01-19T05:00Z", "tournament": {"numberOfRounds": 5},
+                           "competitions": [{"competitors": [winner]}]}]}
+
+    assert json_source.parse_event(payload, "1083", 2011)["win_total"] == "350"
+
+
+def test_json_source_fallback(espn_api_stub):
+
+    fallback = RecordingSource()
+    json_source = JsonSource(api_url=espn_api_stub, fallback=fallback)
+
+    t_url = "https://www.espn.com/golf/leaderboard?tournamentId=9999"
+    espn_t = json_source.fetch_tournament(t_url, 2018)
+
+    assert espn_t is None
+    assert fallback.t_urls == [t_url]
+
+
+def test_season_uses_source(espn_api_stub):
+
+    e_season = EspnSeason(2018, source=JsonSource(api_url=espn_api_stub, fallback=RecordingSource()))
+
+    e_season.retrieve_tournament_info("https://www.espn.com/golf/leaderboard?tournamentId=3802", "2018")
+    e_season.retrieve_tournament_info("https://www.espn.com/golf/leaderboard?tournamentId=9999", "2018")
+
+    assert [espn_t["tournament_id"] for espn_t in e_season.season_data] == ["3802", ""]
+
+
+def test_schedule_date():
+
+    e_season = EspnSeason(2018)
+
+    assert e_season.schedule_date("Sep 28 - Oct 1", 2017) == "9/28/2017"
+    assert e_season.schedule_date("Jan 4 - 7", 2018) == "1/4/2018"
+
+
+def test_parse_schedule(schedule_content):
+
+    e_season = EspnSeason(2018)
+    schedule = e_season.parse_schedule(schedule_content, "2018")
+
+    t_urls = [t_url for t_url, _ in schedule]
+    tournaments = [espn_t.tournament_info for _, espn_t in schedule]
+
+    assert t_urls[0] == "https://www.espn.com/golf/leaderboard?tournamentId=3802"
+    assert [t["tournament_id"] for t in tournaments] == ["3802", "3803", "3742"]
+    assert [t["tournament_date"] for t in tournaments] == ["10/19/2017", "12/28/2017", "1/4/2018"]
+    assert tournaments[0]["tournament_name"] == "THE CJ CUP @ NINE BRIDGES"
+    assert tournaments[0]["tournament_purse"] == "9250000"
+    assert tournaments[0]["winner_name"] == "Justin Thomas"
+    assert tournaments[0]["winner_id"] == "4848"
+    assert tournaments[0]["win_total"] is None
+    assert tournaments[2]["winner_name"] is None
+    assert tournaments[2]["tournament_purse"] == ""
+
+
+def test_metadata_only_season_skips_leaderboards(monkeypatch, schedule_content):
+
+    source = RecordingSource()
+    e_season = EspnSeason(2018, source=source)
+    monkeypatch.setattr(e_season, "retrieve_schedule",
+                        lambda season_url: e_season.parse_schedule(schedule_content, "2018"))
+
+    e_season.retrieve_all_seasons(fields=SCHEDULE_FIELDS)
+    assert source.t_urls == []
+    assert len(e_season.season_data) == 3
+
+    e_season.retrieve_all_seasons()
+    assert len(source.t_urls) == 3
+    # failed leaderboard fetches keep the schedule fields
+    assert e_season.season_data[-1]["tournament_id"] == "3742"
+
+
+def test_save_metadata_only_season(monkeypatch, tmp_path, schedule_content):
+
+    for path_name in ["RAW_TOURNAMENTS", "PROCESSED_TOURNAMENTS", "QUARANTINE_TOURNAMENTS"]:
+        monkeypatch.setattr(tournament.path_config, path_name, tmp_path)
+
+    e_season = EspnSeason(2018, source=RecordingSource())
+    monkeypatch.setattr(e_season, "retrieve_schedule",
+                        lambda season_url: e_season.parse_schedule(schedule_content, "2018"))
 
-       
+    e_season.retrieve_all_seasons(fields=SCHEDULE_FIELDS)
+    clean_tourn = save_season_data(e_season)
 
+    # win_total and tournament_size were not requested, so they are not validated
+    assert list(clean_tourn.cleaned_df["tournament_id"].astype(str)) == ["3802", "3803"]
+    assert not (tmp_path / "quarantine_tournaments_2018.csv").exists()
@@ -0,0 +1,95 @@
+from pyfantasy import validation
+from pyfantasy.tournament import EspnTournament, optimize_tournament_dtypes
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def checked_df(tournaments_df):
+    """Shared tournaments plus rows breaking the rules or overridden."""
+    problems = [
+        {"tournament_id": "2277", "tournament_name": "Override Open", "tournament_date": "8/1/2016",
+         "tournament_purse": "1000000", "win_total": None, "tournament_size": 150,
+         "winner_name": "Wrong Winner", "winner_id": "1", "season_id": "2016"},
+        {"tournament_id": "3810", "tournament_name": "Blank Total", "tournament_date": "1/11/2018",
+         "tournament_purse": "6300000", "win_total": None, "tournament_size": 34,
+         "winner_name": "Dustin Johnson", "winner_id": "3448", "season_id": "2018"},
+        {"tournament_id": "3804", "tournament_name": "Wrong Season", "tournament_date": "1/4/2015",
+         "tournament_purse": "6300000", "win_total": "270", "tournament_size": 0,
+         "winner_name": "Jon Rahm", "winner_id": "9780", "season_id": "2018"},
+        {"tournament_id": "3806", "tournament_name": "No Date", "tournament_date": None,
+         "tournament_purse": "100", "win_total": None, "tournament_size": None,
+         "winner_name": None, "winner_id": None, "season_id": "2020"},
+    ]
+    df = pd.concat([tournaments_df, pd.DataFrame(problems)], ignore_index=True)
+    df["tournament_date"] = pd.to_datetime(df["tournament_date"])
+    return df
+
+
+def test_default_overrides():
+
+    overrides = validation.load_overrides()
+
+    assert set(overrides[overrides["tournament_id"] == "2277"]["field"]) == {"winner_name", "winner_id", "win_total"}
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_validate_tournaments(checked_df, optimize):
+
+    if optimize:
+        checked_df = optimize_tournament_dtypes(checked_df)
+
+    valid_df, quarantine_df = validation.validate_tournaments(checked_df)
+
+    assert list(valid_df["tournament_id"].astype(str)) == ["3802", "3803", "3757", "401056542", "401155418", "2277"]
+    assert valid_df.loc[valid_df["tournament_id"].astype(str) == "2277", "winner_name"].item() == "Scott Piercy"
+
+    reasons = dict(zip(quarantine_df["tournament_id"].astype(str), quarantine_df["reasons"]))
+    assert reasons == {
+        "3810": "invalid_win_total",
+        "3804": "date_outside_season;invalid_tournament_size",
+        "3806": "invalid_tournament_date",
+    }
+
+
+def test_skip_rule_override(checked_df):
+
+    stableford = {"tournament_id": "3811", "tournament_name": "Barracuda Championship", "tournament_date": "8/2/2018",
+                  "tournament_purse": "3400000", "win_total": "47", "tournament_size": 132,
+                  "winner_name": "Andrew Putnam", "winner_id": "1234", "season_id": "2018"}
+    df = pd.concat([checked_df, pd.DataFrame([stableford])], ignore_index=True)
+
+    overrides = pd.concat([validation.load_overrides(), pd.DataFrame([
+        {"tournament_id": "3811", "field": "skip_rule", "value": "invalid_win_total", "reason": "stableford"},
+    ])], ignore_index=True)
+
+    _, quarantine_df = validation.validate_tournaments(df)
+    assert "3811" in set(quarantine_df["tournament_id"].astype(str))
+
+    valid_df, quarantine_df = validation.validate_tournaments(df, overrides=overrides)
+    assert "3811" in set(valid_df["tournament_id"].astype(str))
+    assert "skip_rule" not in valid_df.columns
+    # other tournaments are still held to the rule
+    assert "3810" in set(quarantine_df["tournament_id"].astype(str))
+
+    tournament_infos = validation.override_tournaments([dict(stableford)], overrides)
+    assert "skip_rule" not in tournament_infos[0]
+
+
+def test_override_tournaments(checked_df):
+
+    tournament_infos = {tournament_info["tournament_id"]: tournament_info
+                        for tournament_info in validation.override_tournaments(checked_df.to_dict("records"))}
+
+    assert tournament_infos["2277"]["winner_name"] == "Scott Piercy"
+    assert tournament_infos["2277"]["win_total"] == "265"
+    assert tournament_infos["3802"]["winner_name"] == "Justin Thomas"
+
+
+def test_date_parser_raises_on_bad_date():
+
+    espn_t = EspnTournament()
+
+    with pytest.raises(ValueError):
+        espn_t.date_parser("TBD 2018")
@@ -0,0 +1,121 @@
+from pyfantasy import work_queue
+from pyfantasy.work_queue import WorkQueue
+
+import pandas as pd
+import pytest
+
+
+T_URL = "https://www.espn.com/golf/leaderboard?tournamentId="
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    w_queue = WorkQueue(tmp_path / "queue.sqlite")
+    w_queue.set_meta("start", 2018)
+    w_queue.set_meta("end", None)
+    for t_id in ["3802", "3803", "3804"]:
+        w_queue.put("2018", T_URL + t_id)
+    w_queue.close()
+
+    return tmp_path / "queue.sqlite"
+
+
+def test_put_is_idempotent(queue_path):
+
+    w_queue = WorkQueue(queue_path)
+    w_queue.put("2018", T_URL + "3802")
+
+    assert w_queue.counts() == {"pending": 3}
+
+
+def test_claim_and_lease_expiry(queue_path):
+
+    w_queue = WorkQueue(queue_path, lease_seconds=-1)
+    first = w_queue.claim("worker-1")
+
+    other = WorkQueue(queue_path)
+    # expired lease is handed out again
+    assert other.claim("worker-2") == first
+
+
+def test_fail_retries_until_max_attempts(queue_path):
+
+    w_queue = WorkQueue(queue_path, max_attempts=2)
+
+    job_id, _, _ = w_queue.claim("worker-1")
+    w_queue.fail(job_id, "worker-1", "timeout")
+    assert w_queue.claim("worker-1")[0] == job_id
+
+    w_queue.fail(job_id, "worker-1", "timeout")
+    assert w_queue.counts() == {"failed": 1, "pending": 2}
+
+
+def test_expired_last_attempt_is_failed(queue_path):
+
+    w_queue = WorkQueue(queue_path, lease_seconds=-1, max_attempts=1)
+    job_id, _, _ = w_queue.claim("worker-1")
+
+    # worker-1 died holding the lease on its only attempt
+    assert w_queue.claim("worker-2")[0] != job_id
+    assert w_queue.counts()["failed"] == 1
+
+
+def test_stale_lease_owner_cannot_release(queue_path):
+
+    w_queue = WorkQueue(queue_path, lease_seconds=-1)
+    job_id, _, _ = w_queue.claim("worker-1")
+    assert w_queue.claim("worker-2")[0] == job_id
+
+    assert not w_queue.fail(job_id, "worker-1", "timeout")
+    assert not w_queue.complete(job_id, "worker-1", {})
+    assert w_queue.complete(job_id, "worker-2", {"tournament_id": job_id})
+    assert w_queue.counts() == {"done": 1, "pending": 2}
+
+
+def retrieve_tournament_info(self, t_url, s_id):
+    espn_t = work_queue.EspnTournament()
+    espn_t.set_tournament_id(t_url)
+    espn_t.set_all_w("Justin Thomas", "4848", "279")
+    espn_t.tournament_info.update({"tournament_date": "10/19/2017", "tournament_purse": "100",
+                                   "tournament_size": 78, "season_id": s_id})
+    self.season_data.append(espn_t)
+    return espn_t
+
+
+def test_worker_and_merge(queue_path, tmp_path, monkeypatch):
+
+    monkeypatch.setattr(work_queue.EspnSeason, "retrieve_tournament_info", retrieve_tournament_info)
+    monkeypatch.setattr(work_queue.path_config, "RAW_TOURNAMENTS", tmp_path)
+    monkeypatch.setattr(work_queue.path_config, "PROCESSED_TOURNAMENTS", tmp_path)
+
+    assert work_queue.worker(queue_path, worker_id="worker-1", max_jobs=2) == 2
+    assert work_queue.worker(queue_path, worker_id="worker-2") == 1
+
+    clean_tourn = work_queue.merge(queue_path)
+
+    assert len(clean_tourn.cleaned_df) == 3
+    assert len(pd.read_csv(tmp_path / "valid_tournaments_2018.csv")) == 3
+
+
+def test_tour_threaded_through_queue(tmp_path, monkeypatch):
+
+    queue_path = tmp_path / "queue.sqlite"
+    season_urls = []
+
+    def season_tournament_urls(self, season_url):
+        season_urls.append(season_url)
+        return [T_URL + t_id for t_id in ["3802", "3803"]]
+
+    monkeypatch.setattr(work_queue.EspnSeason, "season_tournament_urls", season_tournament_urls)
+    monkeypatch.setattr(work_queue.EspnSeason, "retrieve_tournament_info", retrieve_tournament_info)
+    monkeypatch.setattr(work_queue.path_config, "RAW_TOURNAMENTS", tmp_path)
+    monkeypatch.setattr(work_queue.path_config, "PROCESSED_TOURNAMENTS", tmp_path)
+
+    assert work_queue.coordinator(2018, db_path=queue_path, tour="lpga") == {"pending": 2}
+    assert season_urls == ["https://www.espn.com/golf/schedule/_/season/2018/tour/lpga"]
+
+    assert work_queue.worker(queue_path, worker_id="worker-1") == 2
+    work_queue.merge(queue_path)
+
+    # outputs are partitioned by the tour stored on the queue
+    assert len(pd.read_csv(tmp_path / "valid_tournaments_lpga_2018.csv")) == 2
@@ -0,0 +1,66 @@
+from pyfantasy import writer
+from pyfantasy.tournament import optimize_tournament_dtypes
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def optimized_df(tournaments_df):
+    return optimize_tournament_dtypes(tournaments_df)
+
+
+def test_atomic_write_keeps_file_on_error(tmp_path):
+
+    file_path = tmp_path / "tournaments.csv"
+    writer.atomic_write_csv(pd.DataFrame({"a": [1]}), file_path)
+
+    def failing_write(tmp_name):
+        Path(tmp_name).write_text("a\n")
+        raise RuntimeError("crash mid write")
+
+    with pytest.raises(RuntimeError):
+        writer.atomic_write(file_path, failing_write)
+
+    assert pd.read_csv(file_path)["a"].tolist() == [1]
+    assert [p.name for p in tmp_path.iterdir()] == ["tournaments.csv"]
+
+
+def test_write_shards_manifest(optimized_df, tmp_path):
+
+    manifest = writer.write_shards(optimized_df, tmp_path)
+
+    assert manifest["schema_version"] == writer.SCHEMA_VERSION
+    assert [(s["partition"], s["rows"]) for s in manifest["shards"]] == [("2018", 3), ("2019", 1), ("2020", 1)]
+    assert json.loads((tmp_path / "manifest.json").read_text()) == manifest
+
+
+def test_read_shards_selects_partitions(optimized_df, tmp_path):
+
+    writer.write_shards(optimized_df, tmp_path)
+
+    df = writer.read_shards(tmp_path, partitions=[2019], verify=True)
+
+    assert df["tournament_id"].tolist() == [401056542]
+    assert df["winner_name"].dtype == "category"
+    assert pd.api.types.is_datetime64_any_dtype(df["tournament_date"])
+
+
+def test_write_shards_keeps_other_partitions(optimized_df, tmp_path):
+
+    writer.write_shards(optimized_df, tmp_path)
+    writer.write_shards(optimized_df[optimized_df["season_id"] == "2019"], tmp_path)
+
+    assert len(writer.read_shards(tmp_path)) == 5
+
+
+def test_read_shards_checksum_mismatch(optimized_df, tmp_path):
+
+    writer.write_shards(optimized_df, tmp_path)
+    (tmp_path / "season_id=2018.csv").write_text("tampered\n")
+
+    with pytest.raises(ValueError):
+        writer.read_shards(tmp_path, verify=True)